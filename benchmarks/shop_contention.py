@@ -0,0 +1,85 @@
+"""
+Contention benchmark for limited-stock purchases.
+
+Seeds a throwaway database on a local mongod and fires every buyer at one item
+at the same time, once buying directly and once through the FIFO queue, then
+checks nothing was oversold and reports throughput, latency and fairness.
+
+Run from the repository root:
+    python -m benchmarks.shop_contention --buyers 200 --stock 50
+"""
+import argparse
+import asyncio
+import time
+
+from pymongo import AsyncMongoClient
+
+from utils.economy import Economy
+from utils.inventory import Inventory
+from utils.leaderboard import Leaderboard
+from utils.purchases import PURCHASED, Purchases
+
+PRICE = 100
+
+
+async def run(client, db_name: str, buyers: int, stock: int, queue: bool) -> None:
+    await client.drop_database(db_name)
+    db = client[db_name]
+    await db.inventory.create_index([("user_id", 1), ("item_id", 1)], unique=True)
+    await db.users.create_index([("guild_id", 1), ("user_id", 1)], unique=True)
+    await db.shop.insert_one({"item_id": 1, "name": "Drop", "price": PRICE, "stock": stock, "queue": queue})
+    await db.users.insert_many([{"guild_id": "0", "user_id": str(i), "balance": 1000} for i in range(buyers)])
+
+    item = await db.shop.find_one({"item_id": 1})
+    # An unloaded leaderboard ignores updates, so only the purchase path is measured
+    purchases = Purchases(db.shop, Economy(db, Leaderboard(db.users)), Inventory(db.inventory))
+    latencies = [0.0] * buyers
+    outcomes = [None] * buyers
+
+    async def buyer(i: int) -> None:
+        started = time.perf_counter()
+        outcomes[i] = (await purchases.buy("0", str(i), item)).status
+        latencies[i] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    # Tasks start in index order, so the index is each buyer's arrival position
+    await asyncio.gather(*(buyer(i) for i in range(buyers)))
+    elapsed = time.perf_counter() - started
+    await purchases.stop()
+
+    sold = outcomes.count(PURCHASED)
+    remaining = (await db.shop.find_one({"item_id": 1}))["stock"]
+    owned = await db.inventory.count_documents({})
+    spent = buyers * 1000 - sum([user["balance"] async for user in db.users.find({}, {"balance": 1})])
+    winners = [i for i, status in enumerate(outcomes) if status == PURCHASED]
+    in_order = sum(1 for i in winners if i < stock)
+    latencies.sort()
+
+    print(f"{'queue' if queue else 'direct':>6}: {buyers} buyers, {stock} units in {elapsed * 1000:.1f}ms "
+          f"({buyers / elapsed:.0f} requests/s)")
+    print(f"        sold {sold}, left {remaining}, inventory rows {owned}, coins spent {spent} "
+          f"-> {'OK' if sold + remaining == stock and owned == sold and spent == sold * PRICE else 'INCONSISTENT'}")
+    print(f"        p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms, "
+          f"winners among the first {stock} arrivals: {in_order}/{len(winners)}")
+
+    await client.drop_database(db_name)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="moneybot_benchmark")
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--stock", type=int, default=50)
+    args = parser.parse_args()
+
+    client = AsyncMongoClient(args.uri, maxPoolSize=100)
+    try:
+        for queue in (False, True):
+            await run(client, args.db, args.buyers, args.stock, queue)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -13,25 +13,28 @@ class ActivityTracker(commands.Cog):
         self.bot = bot
         self.tracked_users = {}  # Format: {user_id: {"channel_id": channel_id, "activities": {activity_name: {"start_time": datetime}}}}
         self.notification_channel = None  # Default notification channel ID
-        self._load_data()
 
-    def _save_data(self):
+    async def cog_load(self):
+        """Load tracked users' data when the cog is loaded."""
+        await self._load_data()
+
+    async def _save_data(self):
         """Save tracked users' data to MongoDB."""
         for user_id, data in self.tracked_users.items():
             activities = {
                 name: {"start_time": activity["start_time"].isoformat()}
                 for name, activity in data["activities"].items()
             }
-            self.bot.db["activity_tracker"].update_one(
+            await self.bot.db["activity_tracker"].update_one(
                 {"user_id": user_id},
                 {"$set": {"channel_id": data["channel_id"], "activities": activities}},
                 upsert=True,
             )
 
-    def _load_data(self):
+    async def _load_data(self):
         """Load tracked users' data from MongoDB."""
         self.tracked_users.clear()
-        for record in self.bot.db["activity_tracker"].find():
+        async for record in self.bot.db["activity_tracker"].find():
             if "user_id" in record and "channel_id" in record and "activities" in record:
                 activities = {
                     name: {"start_time": datetime.fromisoformat(activity["start_time"])}
@@ -60,7 +63,7 @@ class ActivityTracker(commands.Cog):
                 "channel_id": channel.id if channel else self.notification_channel,
                 "activities": {},
             }
-            self._save_data()
+            await self._save_data()
             await interaction.response.send_message(
                 f"Started tracking {user.name}'s activities. Notifications will be sent to {channel.mention if channel else 'the default channel.'}",
                 ephemeral=True,
@@ -72,7 +75,7 @@ class ActivityTracker(commands.Cog):
         """Stop tracking a user's activities."""
         if str(user.id) in self.tracked_users:
             del self.tracked_users[str(user.id)]
-            self.bot.db["activity_tracker"].delete_one({"user_id": str(user.id)})
+            await self.bot.db["activity_tracker"].delete_one({"user_id": str(user.id)})
             await interaction.response.send_message(f"Stopped tracking {user.name}'s activities.", ephemeral=True)
         else:
             await interaction.response.send_message(f"{user.name} is not being tracked.", ephemeral=True)
@@ -142,7 +145,7 @@ class ActivityTracker(commands.Cog):
 
             # Update tracked data
             self.tracked_users[user_id]["activities"] = new_activities
-            self._save_data()
+            await self._save_data()
 
     def _get_activity_details(self, activities, activity_name):
         """Extract details about a specific activity."""
@@ -1,16 +1,14 @@
 import discord
 from discord.ext import commands
 import requests
-from pymongo import MongoClient
 import os
+from utils.message_log import COLLECTION
 
 class SpeechAnalyzer(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        mongo_url = os.getenv("MONGODB_URI")  # MongoDB URI from bot instance
-        mongo_client = MongoClient(mongo_url)
-        self.db = mongo_client["discord"]
-        self.collection = self.db["messages"]  # Messages collection
+        self.db = bot.db  # Shared async MongoDB database
+        self.collection = self.db[COLLECTION]  # Logged messages, _id is the snowflake
         self.ollama_url = os.getenv("OLLAMA_URL")  # Ollama instance URL from bot instance
 
     def is_authorized_user(interaction: discord.Interaction):
@@ -30,10 +28,11 @@ class SpeechAnalyzer(commands.Cog):
 
         # Fetch the most recent messages from MongoDB
         from bson import Int64
-        messages = list(
-            self.collection.find({"author_id": Int64(user.id)})
-            .sort("timestamp", -1)  # Sort by timestamp in descending order
+        messages = await (
+            self.collection.find({"author_id": Int64(user.id)}, {"content": 1})
+            .sort("_id", -1)  # Newest first: snowflakes sort by time
             .limit(message_limit)
+            .to_list(length=message_limit)
         )
 
         if not messages:
@@ -109,10 +108,11 @@ class SpeechAnalyzer(commands.Cog):
         await interaction.response.defer()
 
         from bson import Int64
-        messages = list(
-            self.collection.find({"author_id": Int64(user.id)})
-            .sort("timestamp", -1)  # Sort by timestamp in descending order
+        messages = await (
+            self.collection.find({"author_id": Int64(user.id)}, {"content": 1})
+            .sort("_id", -1)  # Newest first: snowflakes sort by time
             .limit(75) # adjust this amount
+            .to_list(length=75)
         )
 
         if not messages:
@@ -23,11 +23,11 @@ class AutoBanner(commands.Cog):
         return user.id == AUTHORIZED_USER_ID
 
     async def get_banners(self):
-        data = self.db.find_one({"setting": "banner_data"})
+        data = await self.db.find_one({"setting": "banner_data"})
         return data.get("banners", []) if data else []
 
-    def save_rotation_interval(self):
-        self.db.update_one(
+    async def save_rotation_interval(self):
+        await self.db.update_one(
             {"setting": "banner_data"},
             {"$set": {"interval": self.rotation_interval}},
             upsert=True
@@ -38,12 +38,12 @@ class AutoBanner(commands.Cog):
         if not self.is_authorized(interaction.user):
             return await interaction.response.send_message("Unauthorized", ephemeral=True)
 
-        data = self.db.find_one({"setting": "banner_data"}) or {"banners": []}
+        data = await self.db.find_one({"setting": "banner_data"}) or {"banners": []}
         if url in data["banners"]:
             return await interaction.response.send_message("Banner already exists.", ephemeral=True)
 
         data["banners"].append(url)
-        self.db.update_one({"setting": "banner_data"}, {"$set": {"banners": data["banners"]}}, upsert=True)
+        await self.db.update_one({"setting": "banner_data"}, {"$set": {"banners": data["banners"]}}, upsert=True)
         await interaction.response.send_message("Banner added.", ephemeral=True)
 
     @app_commands.command(name="removebanner", description="Remove a banner from the rotation list.")
@@ -51,12 +51,12 @@ class AutoBanner(commands.Cog):
         if not self.is_authorized(interaction.user):
             return await interaction.response.send_message("Unauthorized", ephemeral=True)
 
-        data = self.db.find_one({"setting": "banner_data"}) or {"banners": []}
+        data = await self.db.find_one({"setting": "banner_data"}) or {"banners": []}
         if url not in data["banners"]:
             return await interaction.response.send_message("Banner not found.", ephemeral=True)
 
         data["banners"].remove(url)
-        self.db.update_one({"setting": "banner_data"}, {"$set": {"banners": data["banners"]}}, upsert=True)
+        await self.db.update_one({"setting": "banner_data"}, {"$set": {"banners": data["banners"]}}, upsert=True)
         await interaction.response.send_message("Banner removed.", ephemeral=True)
 
     @app_commands.command(name="listbanners", description="List all banners.")
@@ -107,7 +107,7 @@ class AutoBanner(commands.Cog):
             return await interaction.response.send_message("Interval must be > 0.", ephemeral=True)
 
         self.rotation_interval = seconds
-        self.save_rotation_interval()
+        await self.save_rotation_interval()
         self._rotate_banners.change_interval(seconds=self.rotation_interval)
         await interaction.response.send_message(f"Interval set to {seconds} seconds.", ephemeral=True)
 
@@ -19,11 +19,11 @@ class AvatarTracker(commands.Cog):
         ] = {}  # Dictionary to store user tracking info
         self.notification_channel: Optional[int] = None  # Default notification channel
         self.session: Optional[aiohttp.ClientSession] = None  # aiohttp session
-        self._load_data()
 
     async def cog_load(self) -> None:
-        """Initialize the aiohttp session when the cog is loaded."""
+        """Initialize the aiohttp session and load saved data when the cog is loaded."""
         self.session = aiohttp.ClientSession()
+        await self._load_data()
 
     async def cog_unload(self) -> None:
         """Close the aiohttp session when the cog is unloaded."""
@@ -35,9 +35,9 @@ class AvatarTracker(commands.Cog):
         """Check if the user is authorized."""
         return interaction.user.id == 183743105688797184
 
-    def _load_data(self) -> None:
+    async def _load_data(self) -> None:
         """Load tracked users and notification channel from the database."""
-        data = self.db.find_one({"setting": "avatar_data"})
+        data = await self.db.find_one({"setting": "avatar_data"})
         if data:
             self.tracked_users = data.get("tracked_users", {})
             self.notification_channel = data.get("notification_channel")
@@ -51,9 +51,9 @@ class AvatarTracker(commands.Cog):
                 if "channel_id" not in user_data:
                     user_data["channel_id"] = None
 
-    def _save_data(self) -> None:
+    async def _save_data(self) -> None:
         """Save tracked users and notification channel to the database."""
-        self.db.update_one(
+        await self.db.update_one(
             {"setting": "avatar_data"},
             {
                 "$set": {
@@ -110,7 +110,7 @@ class AvatarTracker(commands.Cog):
     ) -> None:
         """Set the global notification channel."""
         self.notification_channel = channel.id
-        self._save_data()
+        await self._save_data()
         await interaction.response.send_message(
             f"Default avatar notifications will be sent to {channel.mention}.",
             ephemeral=True,
@@ -139,7 +139,7 @@ class AvatarTracker(commands.Cog):
             "server_avatar_url": None,  # Initialize server avatar URL as None
             "channel_id": channel.id if channel else None,
         }
-        self._save_data()
+        await self._save_data()
 
         channel_info = (
             f"in {channel.mention}"
@@ -166,7 +166,7 @@ class AvatarTracker(commands.Cog):
             return
 
         del self.tracked_users[str(user.id)]
-        self._save_data()
+        await self._save_data()
         await interaction.response.send_message(
             f"Stopped tracking {user.name}'s avatars.", ephemeral=True
         )
@@ -190,15 +190,17 @@ class AvatarTracker(commands.Cog):
             color=discord.Color.blue(),
         )
 
+        profiles = await self.bot.user_resolver.resolve_many(
+            int(user_id) for user_id in self.tracked_users
+        )
+
         for user_id, user_data in self.tracked_users.items():
             if isinstance(user_data, dict):
                 channel_id = user_data.get("channel_id", self.notification_channel)
                 channel_mention = f"<#{channel_id}>" if channel_id else "No channel set"
-                user = self.bot.get_user(int(user_id)) or await self.bot.fetch_user(
-                    int(user_id)
-                )
+                profile = profiles[int(user_id)]
                 embed.add_field(
-                    name=f"{user.name}#{user.discriminator} ({user.id})",
+                    name=f"{profile.tag if profile else 'Unknown User'} ({user_id})",
                     value=f"Notification Channel: {channel_mention}",
                     inline=False,
                 )
@@ -271,7 +273,7 @@ class AvatarTracker(commands.Cog):
             user_data["global_avatar_url"] = new_avatar_url
         elif avatar_type == "server":
             user_data["server_avatar_url"] = new_avatar_url
-        self._save_data()
+        await self._save_data()
 
         # Determine the notification channel
         channel_id = user_data.get("channel_id", self.notification_channel)
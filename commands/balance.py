@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.economy import guild_key
 
 class Balance(commands.Cog):
     def __init__(self, bot):
@@ -14,9 +15,10 @@ class Balance(commands.Cog):
         # Default to the command invoker if no member is specified
         target = member or interaction.user
         user_id = str(target.id)
+        guild_id = guild_key(interaction.guild)
         
-        # Fetch user data from the database
-        user_data = self.bot.db['users'].find_one({"user_id": user_id})
+        # Fetch this guild's account for the user
+        user_data = await self.bot.db['users'].find_one({"guild_id": guild_id, "user_id": user_id})
 
         if user_data is None:
             # User is not registered
@@ -26,12 +28,14 @@ class Balance(commands.Cog):
             )
             return
 
-        # Retrieve balance
+        # Retrieve balance and rank within this guild
         balance = user_data.get("balance", 0)
+        rank = await self.bot.leaderboard.rank(guild_id, "balance", user_id, balance)
 
         # Respond with the user's balance
         await interaction.response.send_message(
             f"💰 **{target.display_name}'s Balance:** ${balance}"
+            + (f" (Rank #{rank})" if rank else "")
         )
 
 async def setup(bot):
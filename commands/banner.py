@@ -10,15 +10,15 @@ class Banner(commands.Cog):
         """Slash command to display a user's banner."""
         member = member or interaction.user  # Default to the command invoker
 
-        # Fetch the user's profile (requires Intents.members)
-        user = await self.bot.fetch_user(member.id)
+        # Banners are only available from the API, so use the cached resolver
+        profile = await self.bot.user_resolver.resolve(member.id, with_banner=True)
         
-        if user.banner:
+        if profile and profile.banner_url:
             embed = discord.Embed(
-                title=f"{user.name}'s Banner",
+                title=f"{profile.name}'s Banner",
                 color=discord.Color.blue()
             )
-            embed.set_image(url=user.banner.url)
+            embed.set_image(url=profile.banner_url)
             await interaction.response.send_message(embed=embed)
         else:
             await interaction.response.send_message(f"{member.display_name} does not have a banner set!")
@@ -1,8 +1,43 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.economy import guild_key
 import random
 
+MAX_FLIPS = 100
+
+
+def play_flips(choice: str, bet: int, flips: int, balance: int, martingale: bool):
+    """
+    Play a whole session in memory from one batch of random bits.
+
+    Stops early once the next bet is unaffordable. Returns the outcomes string,
+    wins, losses, net change, total lost and the starting balance the session
+    needs (the largest bet minus what was won before placing it).
+    """
+    bits = random.getrandbits(flips)
+    outcomes = []
+    wins = losses = net = lost = required = 0
+    stake = bet
+    for i in range(flips):
+        if balance + net < stake:
+            break
+        required = max(required, stake - net)
+        result = "heads" if (bits >> i) & 1 else "tails"
+        outcomes.append(result[0].upper())
+        if result == choice:
+            wins += 1
+            net += stake
+            stake = bet
+        else:
+            losses += 1
+            net -= stake
+            lost += stake
+            # Martingale doubles the stake after every loss and resets after a win
+            stake = stake * 2 if martingale else bet
+    return "".join(outcomes), wins, losses, net, lost, required
+
+
 class CoinFlip(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -10,34 +45,47 @@ class CoinFlip(commands.Cog):
     @app_commands.command(name="coinflip", description="Flip a coin and bet an amount")
     @app_commands.describe(
         choice="Pick heads or tails",
-        amount="Amount to bet (type 'all' to bet your entire balance, 'half' to bet half)"
+        amount="Amount to bet (type 'all' to bet your entire balance, 'half' to bet half)",
+        flips=f"Number of flips to play in a row (1-{MAX_FLIPS})",
+        strategy="Keep the same bet, or double it after every loss (martingale)"
     )
     @app_commands.choices(
         choice=[
             app_commands.Choice(name="Heads", value="heads"),
             app_commands.Choice(name="Tails", value="tails"),
+        ],
+        strategy=[
+            app_commands.Choice(name="Flat", value="flat"),
+            app_commands.Choice(name="Martingale", value="martingale"),
         ]
     )
     async def coinflip(
         self,
         interaction: discord.Interaction,
         choice: app_commands.Choice[str],
-        amount: str
+        amount: str,
+        flips: app_commands.Range[int, 1, MAX_FLIPS] = 1,
+        strategy: app_commands.Choice[str] = None
     ):
         user_id = str(interaction.user.id)
-        user_data = self.bot.db['users'].find_one({"user_id": user_id})
+        guild_id = guild_key(interaction.guild)
 
-        if user_data is None:
-            await interaction.response.send_message("You need to register first!", ephemeral=True)
+        if flips > 1 or strategy is not None:
+            await self.multi_flip(interaction, choice, amount, flips, strategy is not None and strategy.value == "martingale")
             return
 
-        current_balance = user_data.get('balance', 0)
+        # A numeric bet needs no read: the conditional update checks the balance itself
+        if amount.lower() in ("all", "half"):
+            user_data = await self.bot.db['users'].find_one({"guild_id": guild_id, "user_id": user_id}, {"balance": 1})
+
+            if user_data is None:
+                await interaction.response.send_message("You need to register first!", ephemeral=True)
+                return
 
-        # Handle "all" or "half" option for betting
-        if amount.lower() == "all":
-            amount = current_balance
-        elif amount.lower() == "half":
-            amount = current_balance // 2
+            current_balance = user_data.get('balance', 0)
+
+            # Handle "all" or "half" option for betting
+            amount = current_balance if amount.lower() == "all" else current_balance // 2
         else:
             try:
                 amount = int(amount)
@@ -45,7 +93,7 @@ class CoinFlip(commands.Cog):
                 await interaction.response.send_message("Invalid amount! Please enter a number, 'all', or 'half'.", ephemeral=True)
                 return
 
-        if amount > current_balance or amount <= 0:
+        if amount <= 0:
             await interaction.response.send_message("Invalid bet amount!", ephemeral=True)
             return
 
@@ -53,39 +101,80 @@ class CoinFlip(commands.Cog):
         result = random.choice(["heads", "tails"])
         win = (result == choice.value)
 
+        # Settle the bet atomically; None means the balance no longer covers it
+        user_data = await self.bot.economy.settle_bet(guild_id, user_id, amount, win)
+        if user_data is None:
+            registered = await self.bot.db['users'].count_documents({"guild_id": guild_id, "user_id": user_id}, limit=1)
+            message = "Invalid bet amount!" if registered else "You need to register first!"
+            await interaction.response.send_message(message, ephemeral=True)
+            return
+
+        new_balance = user_data["balance"]
+
         if not win:
-            # Handle loss case
-            new_balance = current_balance - amount
-            self.bot.db['users'].update_one({"user_id": user_id}, {"$set": {"balance": new_balance}})
-            
-            # Update "money_lost" field
-            money_lost = user_data.get('money_lost', 0)
-            new_money_lost = money_lost + amount
-            self.bot.db['users'].update_one({"user_id": user_id}, {"$set": {"money_lost": new_money_lost}})
-            
-            # Transfer the lost amount to recipient
-            recipient_id = "1263010002482757707"
-            recipient_data = self.bot.db['users'].find_one({"user_id": recipient_id})
-            if recipient_data:
-                recipient_balance = recipient_data.get('balance', 0)
-                new_recipient_balance = recipient_balance + amount
-                self.bot.db['users'].update_one(
-                    {"user_id": recipient_id},
-                    {"$set": {"balance": new_recipient_balance}}
-                )
+            # Transfer the lost amount to a random house shard
+            await self.bot.house.credit(amount)
+            # Count the loss towards today's and this week's /toplosers
+            self.bot.rollups.add(guild_id, user_id, lost=amount)
 
             await interaction.response.send_message(
                 f"The coin landed on **{result}**! You chose **{choice.name}** and bet **{amount}**.\n"
                 f"You lost! Your new balance is: **{new_balance}**."
             )
         else:
-            # Handle win case
-            new_balance = current_balance + amount
-            self.bot.db['users'].update_one({"user_id": user_id}, {"$set": {"balance": new_balance}})
             await interaction.response.send_message(
                 f"The coin landed on **{result}**! You chose **{choice.name}** and bet **{amount}**.\n"
                 f"You won! Your new balance is: **{new_balance}**"
             )
 
+    async def multi_flip(self, interaction: discord.Interaction, choice, amount: str, flips: int, martingale: bool):
+        """Play a whole session in memory and commit it with one conditional update."""
+        user_id = str(interaction.user.id)
+        guild_id = guild_key(interaction.guild)
+
+        # One read: the session stops early when the next bet would be unaffordable
+        user_data = await self.bot.db['users'].find_one({"guild_id": guild_id, "user_id": user_id}, {"balance": 1})
+        if user_data is None:
+            await interaction.response.send_message("You need to register first!", ephemeral=True)
+            return
+        balance = user_data.get('balance', 0)
+
+        if amount.lower() in ("all", "half"):
+            bet = balance if amount.lower() == "all" else balance // 2
+        else:
+            try:
+                bet = int(amount)
+            except ValueError:
+                await interaction.response.send_message("Invalid amount! Please enter a number, 'all', or 'half'.", ephemeral=True)
+                return
+
+        if bet <= 0 or bet > balance:
+            await interaction.response.send_message("Invalid bet amount!", ephemeral=True)
+            return
+
+        outcomes, wins, losses, net, lost, required = play_flips(choice.value, bet, flips, balance, martingale)
+
+        # Fails only if the balance dropped below what the session needed since the read
+        user_data = await self.bot.economy.settle_flips(guild_id, user_id, net, lost, required)
+        if user_data is None:
+            await interaction.response.send_message("Your balance changed mid-session, try again!", ephemeral=True)
+            return
+
+        if lost:
+            await self.bot.house.credit(lost)
+            self.bot.rollups.add(guild_id, user_id, lost=lost)
+
+        stopped = f" (stopped after {len(outcomes)}: out of money)" if len(outcomes) < flips else ""
+        await interaction.response.send_message(
+            f"**{'Martingale' if martingale else 'Flat'}** on **{choice.name}**, base bet **{bet}**, {flips} flips{stopped}\n"
+            f"`{outcomes}`\n"
+            f"**{wins}W / {losses}L**, net **{net:+}**, lost **{lost}**. Your new balance is: **{user_data['balance']}**"
+        )
+
+    @app_commands.command(name="treasury", description="Shows how much the house has won.")
+    async def treasury(self, interaction: discord.Interaction):
+        total = await self.bot.house.total()
+        await interaction.response.send_message(f"🏦 **House Treasury:** ${total}")
+
 async def setup(bot):
     await bot.add_cog(CoinFlip(bot))
@@ -1,17 +1,15 @@
 import discord
 from discord.ext import commands
 import requests
-from pymongo import MongoClient
 import os
 from typing import Optional
+from utils.message_log import COLLECTION
 
 class GenerateCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        mongo_url = os.getenv("MONGODB_URI")
-        mongo_client = MongoClient(mongo_url)
-        self.db = mongo_client["discord"]
-        self.collection = self.db["messages"]
+        self.db = bot.db
+        self.collection = self.db[COLLECTION]
         self.ollama_url = os.getenv("OLLAMA_URL")
 
     @discord.app_commands.command(
@@ -23,10 +21,11 @@ class GenerateCommand(commands.Cog):
         
         try:
             # Get last 50 messages from everyone
-            messages = list(
-                self.collection.find()
-                .sort("timestamp", -1)
+            messages = await (
+                self.collection.find({}, {"author_id": 1, "content": 1})
+                .sort("_id", -1)  # Newest first: snowflakes sort by time
                 .limit(100)
+                .to_list(length=100)
             )
 
             if not messages:
@@ -1,6 +1,10 @@
+import re
+import time
+from typing import Optional
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.economy import guild_key
 
 class GiveMoney(commands.Cog):
     def __init__(self, bot):
@@ -14,6 +18,7 @@ class GiveMoney(commands.Cog):
     async def give(self, interaction: discord.Interaction, recipient: discord.User, amount: int):
         sender_id = str(interaction.user.id)
         recipient_id = str(recipient.id)
+        guild_id = guild_key(interaction.guild)
 
         if sender_id == recipient_id:
             await interaction.response.send_message("You cannot give money to yourself!", ephemeral=True)
@@ -23,38 +28,98 @@ class GiveMoney(commands.Cog):
             await interaction.response.send_message("You must give a positive amount!", ephemeral=True)
             return
 
-        # Fetch sender and recipient data
-        sender_data = self.bot.db['users'].find_one({"user_id": sender_id})
-        recipient_data = self.bot.db['users'].find_one({"user_id": recipient_id})
+        # Debit the sender only if they can afford it, then credit the recipient (created if missing)
+        result = await self.bot.economy.transfer(guild_id, sender_id, recipient_id, amount)
 
-        if sender_data is None:
-            await interaction.response.send_message("You need to register first!", ephemeral=True)
+        if result is None:
+            registered = await self.bot.db['users'].count_documents({"guild_id": guild_id, "user_id": sender_id}, limit=1)
+            if not registered:
+                await interaction.response.send_message("You need to register first!", ephemeral=True)
+            else:
+                await interaction.response.send_message("You don't have enough money to give!", ephemeral=True)
             return
 
-        if sender_data.get("balance", 0) < amount:
-            await interaction.response.send_message("You don't have enough money to give!", ephemeral=True)
-            return
-
-        # Update balances
-        new_sender_balance = sender_data["balance"] - amount
-        self.bot.db['users'].update_one({"user_id": sender_id}, {"$set": {"balance": new_sender_balance}})
-
-        if recipient_data:
-            # Recipient exists in the database
-            new_recipient_balance = recipient_data["balance"] + amount
-            self.bot.db['users'].update_one({"user_id": recipient_id}, {"$set": {"balance": new_recipient_balance}})
-        else:
-            # Create recipient in the database if they don't exist
-            self.bot.db['users'].insert_one({
-                "user_id": recipient_id,
-                "balance": amount,
-                "reacted_messages": []  # Initialize with an empty reacted messages list
-            })
+        sender_data, _ = result
+        new_sender_balance = sender_data["balance"]
 
         await interaction.response.send_message(
             f"You successfully gave **${amount}** to {recipient.mention}.\n"
             f"Your new balance is **${new_sender_balance}**."
         )
 
+    @app_commands.command(name="airdrop", description="Give the same amount to a role, a list of users, or the whole server")
+    @app_commands.describe(
+        amount="The amount each recipient gets",
+        role="Pay everyone with this role",
+        users="Mentions or IDs of the users to pay",
+        everyone="Pay every member of the server"
+    )
+    async def airdrop(
+        self,
+        interaction: discord.Interaction,
+        amount: int,
+        role: Optional[discord.Role] = None,
+        users: Optional[str] = None,
+        everyone: bool = False
+    ):
+        sender_id = str(interaction.user.id)
+
+        if amount <= 0:
+            await interaction.response.send_message("You must give a positive amount!", ephemeral=True)
+            return
+
+        # Collect recipients from every source given, without bots, duplicates or the sender
+        recipient_ids = set()
+        if everyone and interaction.guild:
+            recipient_ids.update(str(member.id) for member in interaction.guild.members if not member.bot)
+        if role:
+            recipient_ids.update(str(member.id) for member in role.members if not member.bot)
+        skipped = 0
+        if users:
+            # Only pay IDs that resolve to human members of this server
+            for user_id in set(re.findall(r"\d{15,20}", users)):
+                member = interaction.guild.get_member(int(user_id)) if interaction.guild else None
+                if member is None or member.bot:
+                    skipped += 1
+                else:
+                    recipient_ids.add(str(member.id))
+        recipient_ids.discard(sender_id)
+
+        if not recipient_ids:
+            await interaction.response.send_message("Pick a role, some users, or everyone to airdrop to!", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+
+        # One debit for the whole drop, then one bulk upsert for every credit
+        started = time.perf_counter()
+        recipient_ids = sorted(recipient_ids)
+        result = await self.bot.economy.airdrop(guild_key(interaction.guild), sender_id, recipient_ids, amount)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if result is None:
+            total = amount * len(recipient_ids)
+            await interaction.followup.send(
+                f"You don't have enough money to give **${amount}** to {len(recipient_ids)} users (**${total}**)!",
+                ephemeral=True
+            )
+            return
+
+        sender_data, credited, failed = result
+        lines = [
+            f"Airdropped **${amount}** each to **{len(credited)}** users (**${amount * len(credited)}** total) in {elapsed_ms:.0f}ms.",
+            f"Your new balance is **${sender_data['balance']}**.",
+        ]
+        if len(recipient_ids) <= 20:
+            # Small drops list every recipient's outcome
+            lines.append(" ".join(f"{'✅' if user_id not in failed else '❌'} <@{user_id}>" for user_id in recipient_ids))
+        if skipped:
+            lines.append(f"Skipped {skipped} IDs that aren't members of this server or are bots.")
+        if failed:
+            lines.append(f"Failed (refunded): {' '.join(f'<@{user_id}>' for user_id in failed[:20])}"
+                         + (f" and {len(failed) - 20} more" if len(failed) > 20 else ""))
+
+        await interaction.followup.send("\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
+
 async def setup(bot):
     await bot.add_cog(GiveMoney(bot))
@@ -1,46 +1,26 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.economy import guild_key
+from utils.leaderboard_view import LeaderboardView
 
 class Losstop(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @app_commands.command(name="losstop", description="Displays the top 10 users who lost the most money.")
+    @app_commands.command(name="losstop", description="Displays the users who lost the most money.")
     async def losstop(self, interaction: discord.Interaction):
         await interaction.response.defer()  # Acknowledge the interaction
 
         try:
-            # Find the top 10 users sorted by money_lost in descending order
-            top_users = list(self.bot.db['users'].find({"money_lost": {"$exists": True}}).sort("money_lost", -1).limit(10))
+            # Pages are fetched by keyset cursor, so later pages cost the same as the first
+            view = LeaderboardView(self.bot, guild_key(interaction.guild), "money_lost", "Top bums 😂😂😂", 0xFF0000, str(interaction.user.id))
+            await view.load_page()
 
-            if not top_users:
+            if not view.rows:
                 return await interaction.followup.send("No users have lost money yet.")
 
-            # Create the embed
-            embed = discord.Embed(title="Top 10 bums 😂😂😂", color=0xFF0000)
-
-            for index, user in enumerate(top_users):
-                user_id = int(user["user_id"])
-                discord_user = self.bot.get_user(user_id)  # Try getting the user from cache
-
-                if not discord_user:
-                    # Fetch the user from Discord API if not cached
-                    try:
-                        discord_user = await self.bot.fetch_user(user_id)
-                    except discord.NotFound:
-                        discord_user = None
-
-                # Build the mention or fallback to just the user ID
-                if discord_user:
-                    user_mention = f"{discord_user.name}#{discord_user.discriminator}"
-                else:
-                    user_mention = f"<@{user_id}>"
-
-                money_lost = user.get("money_lost", 0)
-                embed.add_field(name=f"{index + 1}. {user_mention}", value=f"${money_lost}", inline=False)
-
-            await interaction.followup.send(embed=embed)  # Send the embed as a follow-up
+            await interaction.followup.send(embed=await view.build_embed(), view=view)  # Send the embed as a follow-up
         except Exception as error:
             print(error)
             await interaction.followup.send("There was an error retrieving the top money losers.", ephemeral=True)
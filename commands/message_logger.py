@@ -1,26 +1,85 @@
-import discord
-from discord.ext import commands
-from pymongo import MongoClient
-from datetime import datetime
 import os
+from datetime import datetime, timedelta, timezone
+import discord
+from discord.ext import commands, tasks
+from utils.backfill import ChannelBackfill
+from utils.message_ingest import MessageIngest
+from utils.message_log import COLLECTION, message_document
 
 class MessageTracker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        mongo_url = os.getenv("MONGODB_URI")  # MongoDB connection
-        mongo_client = MongoClient(mongo_url)
-        self.db = mongo_client["discord"]  # Database name
-        self.collection = self.db["messages"]  # Collection for storing messages
+        self.db = bot.db  # Shared async MongoDB database
+        self.collection = self.db[COLLECTION]  # Messages keyed by snowflake
         self.ignored_channels = set()  # Set of ignored channel IDs
+        # Messages are queued and written in batches instead of one insert per message
+        self.ingest = MessageIngest(
+            self.collection,
+            max_batch=int(os.getenv("MESSAGE_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("MESSAGE_FLUSH_INTERVAL", "2")),
+            max_queue=int(os.getenv("MESSAGE_QUEUE_LIMIT", "10000")),
+            spill_path=os.getenv("MESSAGE_SPILL_PATH", "message_spill.jsonl"),
+        )
+        # Fills in messages sent while the bot was offline; resumes from per-channel checkpoints
+        self.backfill = ChannelBackfill(
+            self.ingest,
+            self.db["backfill_checkpoints"],
+            concurrency=int(os.getenv("BACKFILL_CONCURRENCY", "3")),
+            batch_size=int(os.getenv("BACKFILL_BATCH_SIZE", "500")),
+            max_age_days=float(os.getenv("BACKFILL_MAX_AGE_DAYS", "30")),
+        )
+        self.backfill_hours = float(os.getenv("BACKFILL_INTERVAL_HOURS", "6"))
 
-        # Load ignored channels from the database
-        ignored_channels_data = self.db["ignored_channels"].find_one({"key": "ignored_channels"})
+    async def cog_load(self):
+        """Load ignored channels from the database."""
+        ignored_channels_data = await self.db["ignored_channels"].find_one({"key": "ignored_channels"})
         if ignored_channels_data:
             self.ignored_channels = set(ignored_channels_data.get("channels", []))
+        self.ingest.start()
+        if self.backfill_hours > 0:
+            self.backfill_loop.change_interval(hours=self.backfill_hours)
+            self.backfill_loop.start()
+
+    async def cog_unload(self):
+        """Stop any backfill, then write out every queued message before shutdown."""
+        self.backfill_loop.cancel()
+        await self.backfill.stop()
+        await self.ingest.stop()
+
+    async def backfill_channels(self, guilds):
+        """Text channels and threads in `guilds` whose history the bot can read."""
+        # Threads archived before the crawl window can't hold messages it would pick up
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.backfill.max_age_days)
+        channels = {}  # By id: a recently archived thread can also still be in the cache
+        for guild in guilds:
+            readable = [c for c in guild.text_channels if c.permissions_for(guild.me).read_message_history]
+            channels.update((c.id, c) for c in readable)
+            # Active threads are cached; archived ones have to be listed per channel
+            channels.update((t.id, t) for t in guild.threads if t.permissions_for(guild.me).read_message_history)
+            for channel in readable:
+                try:
+                    # Public only: private archived threads need Manage Threads to list
+                    async for thread in channel.archived_threads(limit=None):
+                        if thread.archive_timestamp < cutoff:
+                            break  # Listed newest-archived first
+                        channels[thread.id] = thread
+                except discord.HTTPException as error:
+                    print(f"[MessageTracker] Could not list archived threads in #{channel.name}: {error}")
+        return list(channels.values())
+
+    @tasks.loop(hours=6)  # Placeholder; interval is set from BACKFILL_INTERVAL_HOURS in cog_load
+    async def backfill_loop(self):
+        # First run happens at startup, catching up on whatever was sent while offline
+        if not self.backfill.running:
+            self.backfill.start(await self.backfill_channels(self.bot.guilds), skip=self.ignored_channels.__contains__)
+
+    @backfill_loop.before_loop
+    async def before_backfill_loop(self):
+        await self.bot.wait_until_ready()
 
     async def save_ignored_channels(self):
         """Save the ignored channels list to the database."""
-        self.db["ignored_channels"].update_one(
+        await self.db["ignored_channels"].update_one(
             {"key": "ignored_channels"},
             {"$set": {"channels": list(self.ignored_channels)}},
             upsert=True
@@ -29,17 +88,51 @@ class MessageTracker(commands.Cog):
     @commands.Cog.listener()
     async def on_message(self, message):
         """Track messages and ignore those from ignored channels."""
+        # Reaction rewards look authors up here instead of fetching the message
+        self.bot.message_authors.remember(message.id, message.author.id)
+
         if message.author.bot or message.channel.id in self.ignored_channels:
             return
 
-        log_entry = {
-            "message_id": message.id,
-            "author_id": message.author.id,
-            "channel_id": message.channel.id,
-            "content": message.content,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        self.collection.insert_one(log_entry)
+        # Snowflake _id: re-logging the same message is rejected as a duplicate
+        self.ingest.add(message_document(message))
+
+    @commands.command(name="ingeststats", help="Show message logger queue metrics.")
+    async def ingest_stats(self, ctx):
+        """Shows message ingest queue depth and flush latency."""
+        stats = self.ingest.stats
+        average_ms = stats["total_flush_ms"] / stats["flushes"] if stats["flushes"] else 0.0
+        await ctx.send(
+            f"Queue depth: {self.ingest.depth} (max {stats['max_depth']})\n"
+            f"Messages: {stats['received']} received, {stats['written']} written\n"
+            f"Flushes: {stats['flushes']} ({stats['failed_flushes']} failed)\n"
+            f"Flush latency: last {stats['last_flush_ms']:.1f}ms, avg {average_ms:.1f}ms\n"
+            f"Spill file: {stats['spilled']} spilled, {stats['replayed']} replayed"
+        )
+
+    @commands.command(name="backfill", help="Crawl channel history into the message log.")
+    @commands.is_owner()
+    async def backfill_history(self, ctx):
+        """Starts a history backfill for this server, resuming each channel and thread from its checkpoint."""
+        # Checked before listing archived threads, which costs API requests
+        if self.backfill.running or not self.backfill.start(await self.backfill_channels([ctx.guild]), skip=self.ignored_channels.__contains__):
+            await ctx.send("A backfill is already running; check `!backfillstatus`.")
+            return
+        await ctx.send("Backfill started.")
+
+    @commands.command(name="backfillstatus", help="Show history backfill progress.")
+    async def backfill_status(self, ctx):
+        """Shows progress of the current or last history backfill."""
+        progress = self.backfill.progress
+        if progress["started_at"] is None:
+            await ctx.send("No backfill has run since startup.")
+            return
+        state = "running" if self.backfill.running else f"finished in {progress['elapsed']:.1f}s"
+        await ctx.send(
+            f"Backfill {state} (started {discord.utils.format_dt(progress['started_at'], 'R')})\n"
+            f"Channels: {progress['channels_done']}/{progress['channels_total']} ({progress['failed_channels']} failed)\n"
+            f"Messages: {progress['messages']} logged"
+        )
 
     @commands.command(name="ignorechannel", help="Add a channel to the ignore list.")
     async def ignore_channel(self, ctx, channel: discord.TextChannel):
@@ -0,0 +1,61 @@
+import os
+from discord.ext import commands, tasks
+from pymongo.errors import PyMongoError
+from utils.payouts import active_users, apply_interest, apply_stipend, current_period, run_payout
+
+class PassiveIncome(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = bot.db
+        # Daily interest on positive balances, capped per user
+        self.interest_rate = float(os.getenv("INTEREST_RATE", "0.001"))
+        self.interest_cap = int(os.getenv("INTEREST_CAP", "1000"))
+        # Flat daily stipend for users who earned reactions the day before
+        self.stipend = int(os.getenv("DAILY_STIPEND", "100"))
+
+    async def cog_load(self):
+        self.payout_loop.start()
+
+    async def cog_unload(self):
+        self.payout_loop.cancel()
+
+    async def run_payouts(self, period: str):
+        """Run every enabled payout for `period`; each is skipped if already finished."""
+        results = {}
+        if self.interest_rate > 0:
+            results["interest"] = await run_payout(
+                self.db, "interest", period,
+                lambda: apply_interest(self.db, period, self.interest_rate, self.interest_cap),
+                self.bot.ledger, self.bot.leaderboard,
+            )
+        if self.stipend > 0:
+            members = await active_users(self.db, period)
+            results["stipend"] = await run_payout(
+                self.db, "stipend", period,
+                lambda: apply_stipend(self.db, period, members, self.stipend),
+                self.bot.ledger, self.bot.leaderboard,
+            )
+        return results
+
+    @tasks.loop(hours=1)
+    async def payout_loop(self):
+        # Hourly so a missed or interrupted day is picked up soon after; finished periods are no-ops
+        try:
+            await self.run_payouts(current_period())
+        except PyMongoError as error:
+            print(f"[PassiveIncome] Payout run failed: {error}")
+
+    @payout_loop.before_loop
+    async def before_payout_loop(self):
+        await self.bot.wait_until_ready()
+
+    @commands.command()
+    @commands.is_owner()
+    async def runpayouts(self, ctx):
+        """Runs today's interest and stipend payouts now (no-op if already paid)."""
+        results = await self.run_payouts(current_period())
+        summary = ", ".join(f"{kind}: {'paid' if ran else 'already paid'}" for kind, ran in results.items())
+        await ctx.send(f"Payouts for {current_period()}: {summary or 'all disabled'}")
+
+async def setup(bot):
+    await bot.add_cog(PassiveIncome(bot))
@@ -11,24 +11,27 @@ class ProfilePictureRotator(commands.Cog):
         self.rotation_interval = 60  # Default interval in seconds
         self.rotation_task = None  # Rotation task instance
         self.session = aiohttp.ClientSession()  # HTTP session
-        self._load_data()  # Load data from the database
+
+    async def cog_load(self):
+        """Load data from the database."""
+        await self._load_data()
 
     def is_authorized_user(interaction: discord.Interaction):
         """Check if the user is authorized."""
         return interaction.user.id == 183743105688797184
 
-    def _load_data(self):
+    async def _load_data(self):
         """Load profile pictures and rotation interval from the database."""
-        data = self.db.find_one({"setting": "profile_picture_data"})
+        data = await self.db.find_one({"setting": "profile_picture_data"})
         if data:
             self.profile_pictures = data.get("pictures", [])
             self.rotation_interval = data.get("interval", 60)
         else:
             self.profile_pictures = []
 
-    def _save_data(self):
+    async def _save_data(self):
         """Save profile pictures and rotation interval to the database."""
-        self.db.update_one(
+        await self.db.update_one(
             {"setting": "profile_picture_data"},
             {"$set": {"pictures": self.profile_pictures, "interval": self.rotation_interval}},
             upsert=True,
@@ -44,7 +47,7 @@ class ProfilePictureRotator(commands.Cog):
         """Add a profile picture to the rotation list."""
         if url not in self.profile_pictures:
             self.profile_pictures.append(url)
-            self._save_data()
+            await self._save_data()
             await interaction.response.send_message(f"Added profile picture to the rotation list.", ephemeral=True)
         else:
             await interaction.response.send_message("This picture is already in the rotation list.", ephemeral=True)
@@ -55,7 +58,7 @@ class ProfilePictureRotator(commands.Cog):
         """Remove a profile picture from the rotation list."""
         if url in self.profile_pictures:
             self.profile_pictures.remove(url)
-            self._save_data()
+            await self._save_data()
             await interaction.response.send_message("Removed profile picture from the rotation list.", ephemeral=True)
         else:
             await interaction.response.send_message("This picture is not in the rotation list.", ephemeral=True)
@@ -92,7 +95,7 @@ class ProfilePictureRotator(commands.Cog):
             await interaction.response.send_message("Interval must be greater than 0 seconds.", ephemeral=True)
             return
         self.rotation_interval = seconds
-        self._save_data()
+        await self._save_data()
         await interaction.response.send_message(f"Rotation interval set to {seconds} seconds.", ephemeral=True)
 
     @discord.app_commands.command(name="startrotation", description="Start rotating profile pictures.")
@@ -1,11 +1,53 @@
+import os
 import discord
 from discord.ext import commands
-from pymongo import MongoClient
+from utils.economy import guild_key
+from utils.reaction_claims import ReactionClaims
+from utils.reward_batcher import RewardBatcher
+from utils.reward_tables import Reward, RewardTables
+from utils.seen_filter import MAYBE, NEW, SEEN, SeenFilter
+from utils.throttle import SlidingWindowThrottle
 
 class ReactionTracker(commands.Cog):
     def __init__(self, bot, db):
         self.bot = bot
         self.db = db  # MongoDB instance passed to the cog
+        # One document per (reactor, message) instead of an ever-growing array on the user
+        ttl_days = os.getenv("REACTION_CLAIM_TTL_DAYS")
+        self.claims = ReactionClaims(self.db.reaction_claims, int(ttl_days) if ttl_days else None)
+        # Rewards are buffered and written in batches instead of per reaction
+        self.batcher = RewardBatcher(
+            self.db.users,
+            max_batch=int(os.getenv("REWARD_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("REWARD_FLUSH_INTERVAL", "2")),
+            claims=self.claims,
+            ledger=bot.ledger,
+        )
+        # Answers most repeat reactions in memory before any database access
+        self.seen = SeenFilter(
+            capacity=int(os.getenv("SEEN_FILTER_CAPACITY", "200000")),
+            error_rate=float(os.getenv("SEEN_FILTER_ERROR_RATE", "0.001")),
+            lru_size=int(os.getenv("SEEN_LRU_SIZE", "10000")),
+        )
+        # Reactions whose message author couldn't be resolved without an API call
+        self.unknown_authors = 0
+        # Each guild's emoji payouts, cached in memory
+        self.reward_tables = RewardTables(self.db.reward_tables)
+        # Caps paid reactions per reactor and emoji so farming never reaches the database
+        self.throttle = SlidingWindowThrottle(
+            window=float(os.getenv("REACTION_RATE_WINDOW", "60")),
+            max_keys=int(os.getenv("REACTION_RATE_USERS", "10000")),
+        )
+
+    async def cog_load(self):
+        """Apply the claim TTL and start the reward flush loop."""
+        await self.claims.ensure_ttl_index()
+        await self.reward_tables.load()
+        self.batcher.start()
+
+    async def cog_unload(self):
+        """Flush any buffered rewards so no payout is lost on unload or shutdown."""
+        await self.batcher.stop()
 
     @commands.command()
     async def track_reaction(self, ctx, message_id: int):
@@ -19,85 +61,149 @@ class ReactionTracker(commands.Cog):
             return
 
         # Add the emojis to the message for tracking
-        await message.add_reaction("💀")
-        await message.add_reaction("😂")
-        await message.add_reaction("🐐")
-        await message.add_reaction("✅")
+        for emoji in self.reward_tables.get(guild_key(ctx.guild)):
+            await message.add_reaction(emoji)
         await ctx.send(f"Now tracking reactions on message ID: {message_id}")
 
+    @commands.command()
+    @commands.guild_only()
+    async def rewards(self, ctx):
+        """Shows this server's reaction payouts."""
+        table = self.reward_tables.get(guild_key(ctx.guild))
+        lines = [f"{emoji} reactor ${r.reactor}, author ${r.author}, {r.limit} per window" for emoji, r in table.items()]
+        await ctx.send("\n".join(lines) or "No reactions pay out here.")
+
+    @commands.command()
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def setreward(self, ctx, emoji: str, reactor: int, author: int, limit: int = 20):
+        """Sets what an emoji pays the reactor and the author in this server."""
+        if reactor < 0 or author < 0 or limit <= 0:
+            await ctx.send("Rewards can't be negative and the limit must be positive.")
+            return
+        await self.reward_tables.set_reward(guild_key(ctx.guild), emoji, Reward(reactor, author, limit))
+        await ctx.send(f"{emoji} now pays the reactor ${reactor} and the author ${author} ({limit} per window).")
+
+    @commands.command()
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def removereward(self, ctx, emoji: str):
+        """Stops an emoji from paying out in this server."""
+        if await self.reward_tables.remove_reward(guild_key(ctx.guild), emoji):
+            await ctx.send(f"{emoji} no longer pays out.")
+        else:
+            await ctx.send(f"{emoji} isn't in this server's reward table.")
+
+    @commands.command()
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def resetrewards(self, ctx):
+        """Restores the default reward table for this server."""
+        await self.reward_tables.reset(guild_key(ctx.guild))
+        await ctx.send("Reward table reset to the defaults.")
+
+    @commands.command()
+    async def rewardstats(self, ctx):
+        """Shows reward batching counters."""
+        stats = self.batcher.stats
+        average_ms = stats["total_flush_ms"] / stats["flushes"] if stats["flushes"] else 0.0
+        await ctx.send(
+            f"Pending users: {self.batcher.pending}\n"
+            f"Flushes: {stats['flushes']} ({stats['failed_flushes']} failed)\n"
+            f"Operations written: {stats['operations']}\n"
+            f"Batch size: last {stats['last_batch_size']}, max {stats['max_batch_size']}\n"
+            f"Flush latency: last {stats['last_flush_ms']:.1f}ms, avg {average_ms:.1f}ms\n"
+            f"Pre-filter: {self.seen.stats[SEEN]} seen, {self.seen.stats[MAYBE]} maybe, {self.seen.stats[NEW]} new\n"
+            f"Throttled: {self.throttle.dropped} dropped "
+            f"({', '.join(f'{emoji} {count}' for emoji, count in self.throttle.dropped_by_key.items()) or 'none'}), "
+            f"{len(self.throttle)} tracked windows\n"
+            f"Author lookups: {self.bot.message_authors.stats['hits']} cached, "
+            f"{self.bot.message_authors.stats['lookups']} from the log, "
+            f"{self.bot.message_authors.stats['cached_misses']} cached misses, {self.unknown_authors} unknown"
+        )
+
     @commands.Cog.listener()
-    async def on_reaction_add(self, reaction, user):
-        """Triggered when a reaction is added to any message."""
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        """Triggered when a reaction is added to any message, cached or not."""
         
         # Ignore bot reactions
-        if user.bot:
+        reactor = payload.member or self.bot.get_user(payload.user_id)
+        if payload.user_id == self.bot.user.id or (reactor and reactor.bot):
+            return
+
+        emoji = str(payload.emoji)
+        guild_id = guild_key(payload.guild_id)  # Economy partition the rewards go to
+
+        # Only emojis in this guild's reward table pay out
+        reward = self.reward_tables.get(guild_id).get(emoji)
+        if reward is None:
             return
 
-        reactor_id = str(user.id)  # ID of the person reacting
-        message_id = str(reaction.message.id)  # ID of the reacted message
-        message_author_id = str(reaction.message.author.id)  # ID of the message author
+        reactor_id = str(payload.user_id)  # ID of the person reacting
+        message_id = str(payload.message_id)  # ID of the reacted message
+
+        # Discord sends the author with the event; otherwise it may be in the logger's cache
+        author_id = getattr(payload, "message_author_id", None) or self.bot.message_authors.cached(payload.message_id)
 
         # Ignore reactions to their own message
-        if reactor_id == message_author_id:
+        if author_id is not None and str(author_id) == reactor_id:
             return
 
-        # Check if the user has already reacted to this message
-        reactor_data = self.db.users.find_one({"user_id": reactor_id})
-        if reactor_data and message_id in reactor_data.get("reacted_messages", []):
-            # User has already reacted to this message; no further rewards
+        # Pre-filter in memory; only "maybe seen" pairs go to the database
+        created_at = discord.utils.snowflake_time(payload.message_id).timestamp()
+        verdict = self.seen.check(reactor_id, message_id, created_at)
+        if verdict == SEEN:
+            return
+        # Over the per-emoji rate limit: drop without touching the database
+        if not self.throttle.allow(f"{guild_id}/{reactor_id}", emoji, reward.limit):
             return
+        # Remember the pair before awaiting so a concurrent repeat is caught above
+        self.seen.add(reactor_id, message_id)
 
-        # Determine rewards based on the emoji
-        if str(reaction.emoji) == "💀":
-            self.reward_users(reactor_id, message_author_id, message_id, 200, 1000)
-        elif str(reaction.emoji) == "😂":
-            self.reward_users(reactor_id, message_author_id, message_id, 50, 250)
-        elif str(reaction.emoji) == "🐐":
-            self.reward_users(reactor_id, message_author_id, message_id, 300, 1500)
-        elif str(reaction.emoji) == "✅":
-            self.reward_users(reactor_id, message_author_id, message_id, 150, 750)
-
-    def reward_users(self, reactor_id, message_author_id, message_id, reactor_reward, author_reward):
+        if author_id is None:
+            # Only events that passed both filters look the author up in the message log, never the API
+            author_id = await self.bot.message_authors.author_of(payload.message_id)
+            if author_id is None or str(author_id) == reactor_id:
+                # Nothing is paid, so don't hold the pair or the rate-limit slot against the reactor
+                self.seen.forget(reactor_id, message_id)
+                self.throttle.release(f"{guild_id}/{reactor_id}", emoji)
+                if author_id is None:
+                    self.unknown_authors += 1
+                return
+        message_author_id = str(author_id)  # ID of the message author
+
+        if verdict == MAYBE:
+            # Claim the (reactor, message) pair; the unique index rejects repeat reactions
+            if self.claims.is_pending(reactor_id, message_id) or not await self.claims.claim(reactor_id, message_id):
+                # User has already reacted to this message; no further rewards
+                return
+        else:
+            # Definitely new: write the claim behind, together with the rewards
+            self.claims.defer(reactor_id, message_id)
+
+        self.reward_users(guild_id, reactor_id, message_author_id, message_id, reward.reactor, reward.author)
+
+    def reward_users(self, guild_id, reactor_id, message_author_id, message_id, reactor_reward, author_reward):
         """
         Reward the reactor and the message author.
 
         Args:
+        - guild_id (str): Guild whose economy pays the rewards.
         - reactor_id (str): User ID of the reactor.
         - message_author_id (str): User ID of the message author.
         - message_id (str): The ID of the message being reacted to.
         - reactor_reward (int): Reward for the reactor.
         - author_reward (int): Reward for the message author.
         """
-        # Reward the reactor
-        reactor_data = self.db.users.find_one({"user_id": reactor_id})
-        if reactor_data:
-            self.db.users.update_one(
-                {"user_id": reactor_id},
-                {
-                    "$inc": {"balance": reactor_reward},
-                    "$addToSet": {"reacted_messages": message_id},  # Add the message ID to the reacted list
-                }
-            )
-        else:
-            self.db.users.insert_one({
-                "user_id": reactor_id,
-                "balance": reactor_reward,
-                "reacted_messages": [message_id]
-            })
+        # Reward the reactor; the batcher merges this with other pending rewards
+        self.batcher.add(guild_id, reactor_id, reactor_reward)
+        self.bot.leaderboard.adjust(guild_id, reactor_id, balance=reactor_reward)
+        self.bot.rollups.add(guild_id, reactor_id, earned=reactor_reward)
 
         # Reward the message author
-        author_data = self.db.users.find_one({"user_id": message_author_id})
-        if author_data:
-            self.db.users.update_one(
-                {"user_id": message_author_id},
-                {"$inc": {"balance": author_reward}}
-            )
-        else:
-            self.db.users.insert_one({
-                "user_id": message_author_id,
-                "balance": author_reward,
-                "reacted_messages": []
-            })
+        self.batcher.add(guild_id, message_author_id, author_reward)
+        self.bot.leaderboard.adjust(guild_id, message_author_id, balance=author_reward)
+        self.bot.rollups.add(guild_id, message_author_id, earned=author_reward)
 
 # Setup the bot and load the extension
 async def setup(bot):
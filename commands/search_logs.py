@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta, timezone
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from discord.ui import Button, View
+from pymongo.errors import ExecutionTimeout, PyMongoError
+
+from utils.message_log import COLLECTION, search_filter, search_page
+
+RESULTS_PER_PAGE = 10
+
+
+def parse_date(value: str) -> datetime:
+    """A YYYY-MM-DD date as midnight UTC."""
+    return datetime.strptime(value.strip(), "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+class SearchLogs(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.collection = bot.db[COLLECTION]  # Logged messages, _id is the snowflake
+
+    @app_commands.command(
+        name="searchlogs",
+        description="Search logged messages, newest first. Keyword searches widen from the last 30 days as you page.",
+    )
+    @app_commands.describe(
+        keywords="Words that must all appear (prefix with - to exclude)",
+        phrase="Exact phrase that must appear",
+        author="Only messages from this user",
+        channel="Only messages in this channel",
+        since="Only messages on or after this date (YYYY-MM-DD, UTC)",
+        until="Only messages on or before this date (YYYY-MM-DD, UTC)",
+    )
+    async def searchlogs(
+        self,
+        interaction: discord.Interaction,
+        keywords: str = None,
+        phrase: str = None,
+        author: discord.User = None,
+        channel: discord.TextChannel = None,
+        since: str = None,
+        until: str = None,
+    ):
+        if interaction.guild is None:
+            await interaction.response.send_message("Logs can only be searched in a server.", ephemeral=True)
+            return
+        if not any((keywords, phrase, author, channel, since, until)):
+            await interaction.response.send_message("Give at least one filter to search by.", ephemeral=True)
+            return
+
+        try:
+            since_at = parse_date(since) if since else None
+            # Inclusive end date: everything before the following midnight
+            until_at = parse_date(until) + timedelta(days=1) if until else None
+        except ValueError:
+            await interaction.response.send_message("Dates must look like 2024-01-31.", ephemeral=True)
+            return
+
+        # Only search channels the caller can read themselves, plus the public threads under them
+        parents = [
+            c.id for c in interaction.guild.text_channels
+            if c.permissions_for(interaction.user).read_message_history
+        ]
+        if channel is not None:
+            if channel.id not in parents:
+                await interaction.response.send_message("You can't read that channel.", ephemeral=True)
+                return
+            parents = [channel.id]
+        # Archived public threads match through parent_id; private threads only for thread moderators
+        readable = parents + [
+            t.id for t in interaction.guild.threads
+            if t.parent_id in parents and (not t.is_private() or t.permissions_for(interaction.user).manage_threads)
+        ]
+
+        query = search_filter(
+            interaction.guild.id,
+            keywords=keywords,
+            phrase=phrase,
+            author_id=author.id if author else None,
+            channel_ids=readable,
+            parent_ids=parents,
+            since=since_at,
+            until=until_at,
+        )
+        await interaction.response.defer(ephemeral=True)
+
+        # Each page starts below the last _id of the previous one (keyset paging)
+        page_starts = [None]
+        page = 1
+
+        async def fetch_page(page: int):
+            # One extra row tells us whether a next page exists without counting
+            rows = await search_page(self.collection, query, page_starts[page - 1], RESULTS_PER_PAGE + 1)
+            has_next = len(rows) > RESULTS_PER_PAGE
+            rows = rows[:RESULTS_PER_PAGE]
+            if has_next and len(page_starts) == page:
+                page_starts.append(rows[-1]["_id"])
+            return rows, has_next
+
+        def build_embed(rows, page: int):
+            embed = discord.Embed(title=f"Search results (Page {page})", color=discord.Color.blurple())
+            for row in rows:
+                sent_at = discord.utils.snowflake_time(row["_id"])
+                content = row.get("content") or "*(no text)*"
+                if len(content) > 200:
+                    content = content[:197] + "..."
+                link = f"https://discord.com/channels/{interaction.guild.id}/{row['channel_id']}/{row['_id']}"
+                embed.add_field(
+                    name=f"{discord.utils.format_dt(sent_at, 'f')}",
+                    value=f"<@{row['author_id']}> in <#{row['channel_id']}> ([jump]({link}))\n{content}",
+                    inline=False,
+                )
+            return embed
+
+        try:
+            rows, has_next = await fetch_page(1)
+        except ExecutionTimeout:
+            await interaction.followup.send("That search is too broad; add keywords, an author, a channel or dates.", ephemeral=True)
+            return
+        except PyMongoError as error:
+            print(f"[SearchLogs] Search failed: {error}")
+            await interaction.followup.send("There was an error searching the logs.", ephemeral=True)
+            return
+
+        if not rows:
+            await interaction.followup.send("No logged messages match that search.", ephemeral=True)
+            return
+
+        previous_button = Button(label="Previous", style=discord.ButtonStyle.primary, disabled=True)
+        next_button = Button(label="Next", style=discord.ButtonStyle.primary, disabled=not has_next)
+
+        async def show(button_interaction: discord.Interaction, new_page: int):
+            nonlocal page
+            try:
+                rows, has_next = await fetch_page(new_page)
+            except PyMongoError as error:
+                print(f"[SearchLogs] Search failed: {error}")
+                await button_interaction.response.send_message("There was an error searching the logs.", ephemeral=True)
+                return
+            page = new_page
+            previous_button.disabled = page == 1
+            next_button.disabled = not has_next
+            await button_interaction.response.edit_message(embed=build_embed(rows, page), view=view)
+
+        async def on_previous_button_click(button_interaction):
+            if page > 1:
+                await show(button_interaction, page - 1)
+
+        async def on_next_button_click(button_interaction):
+            if len(page_starts) > page:
+                await show(button_interaction, page + 1)
+
+        previous_button.callback = on_previous_button_click
+        next_button.callback = on_next_button_click
+
+        view = View()
+        view.add_item(previous_button)
+        view.add_item(next_button)
+
+        await interaction.followup.send(embed=build_embed(rows, page), view=view, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(SearchLogs(bot))
@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.economy import guild_key
 
 allowed_user_id = '183743105688797184'
 
@@ -15,14 +16,8 @@ class SetBalance(commands.Cog):
             return await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
 
         try:
-            user_data = self.bot.db['users'].find_one({"user_id": str(user.id)})
-
-            if user_data is None:
-                # Register the user if they don't exist
-                self.bot.db['users'].insert_one({"user_id": str(user.id), "balance": amount})
-            else:
-                # Update the user's balance
-                self.bot.db['users'].update_one({"user_id": str(user.id)}, {"$set": {"balance": amount}})
+            # Update the user's balance, registering them if they don't exist
+            await self.bot.economy.set_balance(guild_key(interaction.guild), str(user.id), amount)
 
             await interaction.response.send_message(f"Just set {user.display_name}'s balance to ${amount}.")
         except Exception as error:
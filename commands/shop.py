@@ -1,121 +1,165 @@
+import os
 import discord
 from discord.ext import commands
 from discord.ui import Button, View 
+from utils.economy import guild_key
+from utils.inventory import Inventory
+from utils.purchases import CLOSED, INSUFFICIENT_FUNDS, SOLD_OUT, Purchases
+from utils.shop_catalog import ShopCatalog, assign_item_ids
 
 class Shop(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Items are served from memory and reloaded only when the shop collection changes
+        self.catalog = ShopCatalog(bot.db, poll_interval=float(os.getenv("SHOP_CATALOG_POLL_INTERVAL", "60")))
+        # One document per owned item instead of an array on the user
+        self.inventory_store = Inventory(bot.db["inventory"])
+        self.purchases = Purchases(bot.db["shop"], bot.economy, self.inventory_store)
+
+    async def cog_load(self):
+        await self.catalog.load()
+        self.catalog.start()
+
+    async def cog_unload(self):
+        self.catalog.stop()
+        await self.purchases.stop()
+
+    @commands.command()
+    @commands.is_owner()
+    async def reloadshop(self, ctx):
+        """Reloads the shop catalog after editing the shop collection."""
+        # New items added by hand need an item_id before the catalog can list them
+        await assign_item_ids(self.bot.db)
+        await self.catalog.bump_version()
+        await self.catalog.load()
+        await ctx.send(f"Shop catalog reloaded ({len(self.catalog.items)} items, version {self.catalog.version}).")
+
+    @commands.command()
+    @commands.is_owner()
+    async def restock(self, ctx, item_id: int, stock: int, queue: bool = False):
+        """Sets an item's stock (-1 for unlimited); pass `yes` as the third argument to serve buyers first come, first served."""
+        if stock < 0:
+            update = {"$unset": {"stock": "", "queue": ""}}
+        else:
+            update = {"$set": {"stock": stock, "queue": queue}}
+        result = await self.bot.db["shop"].update_one({"item_id": item_id}, update)
+        if not result.matched_count:
+            await ctx.send("Invalid item ID.")
+            return
+        await self.catalog.bump_version()
+        await self.catalog.load()
+        await ctx.send(f"Item {item_id} is now {'unlimited' if stock < 0 else f'limited to {stock} units'}.")
 
     @discord.app_commands.command(name="shop", description="Displays the list of items available in the shop.")
     async def shop(self, interaction: discord.Interaction):
         """Slash command to display the shop."""
-        # Fetch shop items from the MongoDB collection
-        shop_collection = self.bot.db["shop"]  # Replace 'shop' with your actual collection name
-        shop_items = list(shop_collection.find())  # Fetch all items as a list of dictionaries
-
-        if not shop_items:
+        if not self.catalog.embed:
             await interaction.response.send_message("The shop is currently empty!", ephemeral=True)
             return
 
-        embed = discord.Embed(
-            title="Shop Items",
-            description="Here are the items you can purchase (use the index number to buy):",
-            color=discord.Color.gold()
-        )
-
-        for index, item in enumerate(shop_items, start=1):
-            embed.add_field(
-                name=f"{index}. {item['name']} - {item['price']} coins",
-                value=item.get('description', 'No description available.'),
-                inline=False
-            )
+        await interaction.response.send_message(embed=self.catalog.embed)
 
-        await interaction.response.send_message(embed=embed)
-
-    @discord.app_commands.command(name="buy", description="Purchase an item from the shop using its index number.")
-    async def buy(self, interaction: discord.Interaction, item_index: int):
-        """Slash command to purchase an item by index."""
-        shop_collection = self.bot.db["shop"]
+    @discord.app_commands.command(name="buy", description="Purchase an item from the shop using its item ID.")
+    async def buy(self, interaction: discord.Interaction, item_id: int):
+        """Slash command to purchase an item by ID."""
         users_collection = self.bot.db["users"]
 
-        # Fetch all items
-        shop_items = list(shop_collection.find())
-        if not shop_items:
+        if not self.catalog.items:
             await interaction.response.send_message("The shop is currently empty.", ephemeral=True)
             return
 
-        # Check if the index is valid
-        if item_index < 1 or item_index > len(shop_items):
-            await interaction.response.send_message("Invalid item index. Please check the shop and try again.", ephemeral=True)
+        # Look the item up by its stable ID
+        item = self.catalog.get(item_id)
+        if item is None:
+            await interaction.response.send_message("Invalid item ID. Please check the shop and try again.", ephemeral=True)
             return
 
-        # Get the item based on the index
-        item = shop_items[item_index - 1]
-
         # Get the user's wallet using a string user_id
         user_id = str(interaction.user.id)  # Convert user ID to string
-        user_data = users_collection.find_one({"user_id": user_id})
-
-        if not user_data:
-            # Create a new user entry with an initial balance
-            initial_balance = 1000
-            user_data = {"user_id": user_id, "balance": initial_balance, "inventory": []}
-            users_collection.insert_one(user_data)
-            await interaction.response.send_message(
-                f"Welcome! You've been given an initial balance of {initial_balance} coins.",
-                ephemeral=True
-            )
-
-        balance = user_data.get("balance", 0)
+        guild_id = guild_key(interaction.guild)  # Balances are per guild
+
+        # Drops can queue behind other buyers, so don't let the interaction time out
+        if "stock" in item:
+            await interaction.response.defer()
+
+        # Reserve stock and deduct the price with conditional updates
+        result = await self.purchases.buy(guild_id, user_id, item)
+
+        if result.status == INSUFFICIENT_FUNDS:
+            existing = await users_collection.find_one({"guild_id": guild_id, "user_id": user_id}, {"balance": 1})
+
+            if not existing:
+                # Create a new user entry with an initial balance, then retry the purchase
+                initial_balance = 1000
+                await self.bot.economy.credit(guild_id, user_id, initial_balance, reason="welcome")
+                await self._respond(
+                    interaction,
+                    f"Welcome! You've been given an initial balance of {initial_balance} coins.",
+                    ephemeral=True
+                )
+                result = await self.purchases.buy(guild_id, user_id, item)
+                existing = {"balance": initial_balance}
+
+            if result.status == INSUFFICIENT_FUNDS:
+                # Check if the user has enough balance
+                balance = existing.get("balance", 0)
+                await self._respond(
+                    interaction,
+                    f"You do not have enough coins to buy {item['name']}. Your balance is {balance} coins.",
+                    ephemeral=True
+                )
+                return
 
-        # Check if the user has enough balance
-        if balance < item["price"]:
-            await interaction.response.send_message(
-                f"You do not have enough coins to buy {item['name']}. Your balance is {balance} coins.",
-                ephemeral=True
-            )
+        if result.status == CLOSED:
+            await self._respond(interaction, "The shop is restarting. Nothing was charged, please try again shortly.", ephemeral=True)
             return
 
-        # Deduct the price and update the wallet
-        new_balance = balance - item["price"]
-        users_collection.update_one({"user_id": user_id}, {"$set": {"balance": new_balance}})
+        if result.status == SOLD_OUT:
+            await self._respond(interaction, f"{item['name']} is sold out!", ephemeral=True)
+            return
 
-        # Add the item to the user's inventory
-        users_collection.update_one(
-            {"user_id": user_id},
-            {"$push": {"inventory": {"name": item["name"], "price": item["price"]}}}
-        )
+        new_balance = result.user["balance"]
+        left = f" Only {result.stock} left!" if result.stock is not None else ""
 
-        await interaction.response.send_message(
+        await self._respond(
+            interaction,
             f"Successfully purchased {item['name']} for {item['price']} coins! "
-            f"Your new balance is {new_balance} coins."
+            f"Your new balance is {new_balance} coins.{left}"
         )
 
+    @staticmethod
+    async def _respond(interaction: discord.Interaction, content: str, ephemeral: bool = False):
+        """Send a response, or a follow-up if the interaction was already answered."""
+        if interaction.response.is_done():
+            await interaction.followup.send(content, ephemeral=ephemeral)
+        else:
+            await interaction.response.send_message(content, ephemeral=ephemeral)
+
     @discord.app_commands.command(name="inventory", description="View your purchased items.")
     async def inventory(self, interaction: discord.Interaction):
         """Slash command to display the user's inventory with pagination."""
-        users_collection = self.bot.db["users"]
-        
         # Use string user_id for consistency
         user_id = str(interaction.user.id)
-        user_data = users_collection.find_one({"user_id": user_id})
+        item_count = await self.inventory_store.count(user_id)
 
-        if not user_data or not user_data.get("inventory"):
+        if not item_count:
             await interaction.response.send_message("Your inventory is empty.", ephemeral=True)
             return
 
         # Items per page
         items_per_page = 5
-        inventory = user_data["inventory"]
 
         # Calculate the total number of pages
-        total_pages = (len(inventory) + items_per_page - 1) // items_per_page  # ceil division
+        total_pages = (item_count + items_per_page - 1) // items_per_page  # ceil division
+
+        # Each page starts after the last item_id of the previous one (keyset paging)
+        page_starts = [None]
 
         # Create a helper function to build the embed for a page
-        def create_inventory_embed(page: int):
-            start = (page - 1) * items_per_page
-            end = start + items_per_page
-            items_on_page = inventory[start:end]
+        async def create_inventory_embed(page: int):
+            items_on_page = await self.inventory_store.page(user_id, page_starts[page - 1], items_per_page)
+            if len(page_starts) == page and items_on_page:
+                page_starts.append(items_on_page[-1]["item_id"])
 
             embed = discord.Embed(
                 title=f"{interaction.user.display_name}'s Inventory (Page {page}/{total_pages})",
@@ -126,30 +170,29 @@ class Shop(commands.Cog):
             for item in items_on_page:
                 embed.add_field(
                     name=f"{item['name']} - {item['price']} coins",
-                    value="Owned",
+                    value=f"Owned: {item['quantity']}",
                     inline=False
                 )
 
             return embed
 
         # Create the embed for the first page
-        embed = create_inventory_embed(1)
+        embed = await create_inventory_embed(1)
 
         # Create navigation buttons
         async def on_next_button_click(interaction):
             nonlocal page
             if page < total_pages:
                 page += 1
-                embed = create_inventory_embed(page)
+                embed = await create_inventory_embed(page)
                 await interaction.response.edit_message(embed=embed, view=view)
 
         async def on_previous_button_click(interaction):
             nonlocal page
             if page > 1:
                 page -= 1
-                embed = create_inventory_embed(page)
+                embed = await create_inventory_embed(page)
                 await interaction.response.edit_message(embed=embed, view=view)
-
         page = 1
         next_button = Button(label="Next", style=discord.ButtonStyle.primary)
         next_button.callback = on_next_button_click
@@ -7,23 +7,27 @@ class StatusRotator(commands.Cog):
         self.bot = bot
         self.db = bot.db["status_rotation"]  # MongoDB collection for status rotation
         self.rotation_task = None
-        self._load_statuses()
+        self.status_list = []
+
+    async def cog_load(self):
+        """Load statuses when the cog is loaded."""
+        await self._load_statuses()
 
     def is_authorized_user(interaction: discord.Interaction):
         """Check if the user is authorized."""
         return interaction.user.id == 183743105688797184
 
-    def _load_statuses(self):
+    async def _load_statuses(self):
         """Load statuses from the database."""
-        data = self.db.find_one({"setting": "status_data"})
+        data = await self.db.find_one({"setting": "status_data"})
         if data:
             self.status_list = data.get("statuses", [])
         else:
             self.status_list = []
 
-    def _save_statuses(self):
+    async def _save_statuses(self):
         """Save statuses to the database."""
-        self.db.update_one(
+        await self.db.update_one(
             {"setting": "status_data"},
             {"$set": {"statuses": self.status_list}},
             upsert=True,
@@ -76,7 +80,7 @@ class StatusRotator(commands.Cog):
         await self.bot.change_presence(activity=discord.Game(name=next_status))
         # Rotate the list
         self.status_list = self.status_list[1:] + [self.status_list[0]]
-        self._save_statuses()
+        await self._save_statuses()
         await interaction.response.send_message(f"Forced rotation to status: `{next_status}`.", ephemeral=True)
 
     @discord.app_commands.command(name="addstatus", description="Add a new status to the rotation list.")
@@ -84,7 +88,7 @@ class StatusRotator(commands.Cog):
     async def add_status(self, interaction: discord.Interaction, status: str):
         """Add a status to the rotation list."""
         self.status_list.append(status)
-        self._save_statuses()
+        await self._save_statuses()
         await interaction.response.send_message(f"Added status: `{status}` to the rotation list.", ephemeral=True)
 
     @discord.app_commands.command(name="removestatus", description="Remove a status from the rotation list.")
@@ -93,7 +97,7 @@ class StatusRotator(commands.Cog):
         """Remove a status from the rotation list."""
         if status in self.status_list:
             self.status_list.remove(status)
-            self._save_statuses()
+            await self._save_statuses()
             await interaction.response.send_message(f"Removed status: `{status}` from the rotation list.", ephemeral=True)
         else:
             await interaction.response.send_message(f"Status: `{status}` is not in the rotation list.", ephemeral=True)
@@ -10,26 +10,29 @@ class StatusTracker(commands.Cog):
         self.notification_channel = None  # Default notification channel
         self.db = bot.db["status_tracker"]  # MongoDB collection for status tracking
         self.recent_updates = {}  # Track recent updates to debounce duplicate events
-        self._load_data()  # Load existing data from the database
+
+    async def cog_load(self):
+        """Load existing data from the database."""
+        await self._load_data()
 
     def is_authorized_user(interaction: discord.Interaction):
         """Check if the user is authorized."""
         return interaction.user.id == 183743105688797184
 
-    def _load_data(self):
+    async def _load_data(self):
         """Load the tracked users from the database."""
-        data = self.db.find_one({"setting": "status_data"})
+        data = await self.db.find_one({"setting": "status_data"})
         if data:
             self.tracked_users = data.get("tracked_users", {})
             if not isinstance(self.tracked_users, dict):
                 self.tracked_users = {}
             self.notification_channel = data.get("default_channel")
 
-    def _save_data(self):
+    async def _save_data(self):
         """Save the tracked users to the database."""
         if not isinstance(self.tracked_users, dict):
             self.tracked_users = {}
-        self.db.update_one(
+        await self.db.update_one(
             {"setting": "status_data"},
             {"$set": {"tracked_users": self.tracked_users, "default_channel": self.notification_channel}},
             upsert=True,
@@ -40,7 +43,7 @@ class StatusTracker(commands.Cog):
     async def set_status_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         """Set the default notification channel."""
         self.notification_channel = channel.id
-        self._save_data()
+        await self._save_data()
         await interaction.response.send_message(f"Status notifications will be sent to {channel.mention}.", ephemeral=True)
 
     @discord.app_commands.command(name="trackstatus", description="Track a user's status changes.")
@@ -55,7 +58,7 @@ class StatusTracker(commands.Cog):
                 "channel_id": channel.id if channel else None,
                 "start_time": datetime.utcnow().isoformat(),  # Add start time
             }
-            self._save_data()
+            await self._save_data()
             channel_info = f"in {channel.mention}" if channel else "in the default notification channel"
             await interaction.response.send_message(f"Started tracking {user.name}'s status {channel_info}.", ephemeral=True)
 
@@ -65,7 +68,7 @@ class StatusTracker(commands.Cog):
         """Remove a user from the tracked list."""
         if str(user.id) in self.tracked_users:
             del self.tracked_users[str(user.id)]
-            self._save_data()
+            await self._save_data()
             await interaction.response.send_message(f"Stopped tracking {user.name}'s status.", ephemeral=True)
         else:
             await interaction.response.send_message(f"{user.name} is not being tracked.", ephemeral=True)
@@ -84,12 +87,14 @@ class StatusTracker(commands.Cog):
             color=discord.Color.blue(),
         )
 
+        profiles = await self.bot.user_resolver.resolve_many(int(user_id) for user_id in self.tracked_users)
+
         for user_id, data in self.tracked_users.items():
             channel_id = data.get("channel_id")
             channel_mention = f"<#{channel_id}>" if channel_id else f"<#{self.notification_channel}> (default)"
-            user = self.bot.get_user(int(user_id)) or await self.bot.fetch_user(int(user_id))
+            profile = profiles[int(user_id)]
             embed.add_field(
-                name=f"{user.name}#{user.discriminator} ({user.id})",
+                name=f"{profile.tag if profile else 'Unknown User'} ({user_id})",
                 value=f"Notification Channel: {channel_mention}",
                 inline=False,
             )
@@ -139,7 +144,7 @@ class StatusTracker(commands.Cog):
         # Update the tracked status and start time
         self.tracked_users[user_id]["status"] = new_status
         self.tracked_users[user_id]["start_time"] = now.isoformat()
-        self._save_data()
+        await self._save_data()
 
         # Clean up old entries from recent updates after 10 seconds
         await asyncio.sleep(10)
@@ -0,0 +1,36 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from utils.economy import guild_key
+from utils.leaderboard_view import build_window_embed
+
+class TopEarners(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="topearners", description="Displays the users who earned the most from reactions today or this week.")
+    @app_commands.describe(period="Which window to rank")
+    @app_commands.choices(
+        period=[
+            app_commands.Choice(name="Today", value="day"),
+            app_commands.Choice(name="This week", value="week"),
+        ]
+    )
+    async def topearners(self, interaction: discord.Interaction, period: app_commands.Choice[str]):
+        await interaction.response.defer()  # Acknowledge the interaction immediately
+
+        try:
+            # Reads only the current bucket's rollup documents
+            rows = await self.bot.rollups.top(guild_key(interaction.guild), period.value, "earned")
+
+            if not rows:
+                return await interaction.followup.send("Nobody yet. Check back later.")
+
+            embed = await build_window_embed(self.bot, rows, f"Top earners ({period.name.lower()})", 0x00AE86)
+            await interaction.followup.send(embed=embed)
+        except Exception as error:
+            print(error)
+            await interaction.followup.send("There was an error retrieving the board.", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(TopEarners(bot))
@@ -0,0 +1,36 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from utils.economy import guild_key
+from utils.leaderboard_view import build_window_embed
+
+class TopLosers(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="toplosers", description="Displays the users who lost the most at coinflip today or this week.")
+    @app_commands.describe(period="Which window to rank")
+    @app_commands.choices(
+        period=[
+            app_commands.Choice(name="Today", value="day"),
+            app_commands.Choice(name="This week", value="week"),
+        ]
+    )
+    async def toplosers(self, interaction: discord.Interaction, period: app_commands.Choice[str]):
+        await interaction.response.defer()  # Acknowledge the interaction immediately
+
+        try:
+            # Reads only the current bucket's rollup documents
+            rows = await self.bot.rollups.top(guild_key(interaction.guild), period.value, "lost")
+
+            if not rows:
+                return await interaction.followup.send("Nobody yet. Check back later.")
+
+            embed = await build_window_embed(self.bot, rows, f"Top bums ({period.name.lower()})", 0xFF0000)
+            await interaction.followup.send(embed=embed)
+        except Exception as error:
+            print(error)
+            await interaction.followup.send("There was an error retrieving the board.", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(TopLosers(bot))
@@ -1,18 +1,23 @@
 import os
 import discord
 from discord.ext import commands
-from pymongo import MongoClient
 import time
 from dotenv import load_dotenv
+from utils.database import create_mongo_client
+from utils.economy import Economy
+from utils.house import HouseAccount
+from utils.ledger import Ledger
+from utils.leaderboard import Leaderboard
+from utils.message_authors import MessageAuthors
+from utils.message_log import COLLECTION as MESSAGE_LOG
+from utils.migrations import report_slow_plans, run_migrations
+from utils.rollups import EarningsRollups
+from utils.user_resolver import UserResolver
 
 load_dotenv()
 
-# Get the token and MongoDB URI from the environment variables
+# Get the token from the environment variables
 TOKEN = os.getenv('DISCORD_TOKEN')
-MONGODB_URI = os.getenv('MONGODB_URI')
-# Set up the MongoDB client
-mongo_client = MongoClient(MONGODB_URI)
-db = mongo_client['discord']  # Access the 'discord' database
 
 # Store the start time
 start_time = time.time()
@@ -20,8 +25,20 @@ start_time = time.time()
 # Set up the intents
 intents = discord.Intents.all()
 
+class MoneyBot(commands.Bot):
+    async def close(self):
+        # Cogs are unloaded before the connection pool goes away
+        await super().close()
+        # Reward flushes during unload add ledger entries, so the ledger goes last
+        if getattr(self, "ledger", None):
+            await self.ledger.stop()
+        if getattr(self, "rollups", None):
+            await self.rollups.stop()
+        if getattr(self, "mongo_client", None):
+            await self.mongo_client.close()
+
 # Create a bot instance
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = MoneyBot(command_prefix="!", intents=intents)
 
 @bot.event
 async def on_ready():
@@ -38,7 +55,46 @@ async def on_ready():
 # Load commands from the commands directory
 @bot.event
 async def setup_hook():
-    bot.db = db  # Attach the database to the bot instance
+    # One async client (and connection pool) shared by every cog through bot.db
+    bot.mongo_client = create_mongo_client()
+    bot.db = bot.mongo_client['discord']  # Attach the database to the bot instance
+    # Create indexes and apply pending data migrations before any cog touches the data
+    await run_migrations(bot.db)
+    if os.getenv("REPORT_SLOW_QUERIES", "1") != "0":
+        await report_slow_plans(bot.db)
+    # Balance and loss rankings are served from memory after this one load,
+    # or straight from the rank indexes when LEADERBOARD_PRELOAD=0
+    bot.leaderboard = Leaderboard(bot.db['users'])
+    if os.getenv("LEADERBOARD_PRELOAD", "1") != "0":
+        await bot.leaderboard.load()
+    # Append-only record of every balance change, snapshotted periodically
+    bot.ledger = Ledger(
+        bot.db,
+        max_batch=int(os.getenv("LEDGER_BATCH_SIZE", "500")),
+        flush_interval=float(os.getenv("LEDGER_FLUSH_INTERVAL", "2")),
+        snapshot_interval=float(os.getenv("LEDGER_SNAPSHOT_HOURS", "24")),
+    )
+    bot.ledger.start()
+    # Every debit and credit goes through these conditional single-document updates
+    bot.economy = Economy(bot.db, bot.leaderboard, bot.ledger)
+    # Coinflip losses go to a sharded house account instead of one hot user document
+    bot.house = HouseAccount(bot.db['house_account'], shards=int(os.getenv("HOUSE_SHARDS", "16")))
+    # Daily/weekly earned and lost totals behind /topearners and /toplosers
+    bot.rollups = EarningsRollups(bot.db['earnings_rollups'], flush_interval=float(os.getenv("ROLLUP_FLUSH_INTERVAL", "5")))
+    bot.rollups.start()
+    # message_id -> author_id for raw reaction events, fed by the message logger
+    bot.message_authors = MessageAuthors(
+        bot.db[MESSAGE_LOG],
+        max_size=int(os.getenv("MESSAGE_AUTHOR_CACHE_SIZE", "100000")),
+        miss_ttl=float(os.getenv("MESSAGE_AUTHOR_MISS_TTL", "300")),
+    )
+    # Cached user profiles shared by the leaderboards, trackers and /banner
+    bot.user_resolver = UserResolver(
+        bot,
+        ttl=float(os.getenv("USER_CACHE_TTL", "600")),
+        max_size=int(os.getenv("USER_CACHE_SIZE", "5000")),
+        concurrency=int(os.getenv("USER_FETCH_CONCURRENCY", "5")),
+    )
     await bot.load_extension('commands.coinflip')
     await bot.load_extension('commands.setbalance')
     await bot.load_extension('commands.baltop')
@@ -49,13 +105,17 @@ async def setup_hook():
     await bot.load_extension('commands.give')
     await bot.load_extension('commands.balance')
     await bot.load_extension('commands.losstop')
+    await bot.load_extension('commands.topearners')
+    await bot.load_extension('commands.toplosers')
     await bot.load_extension('commands.shop')
+    await bot.load_extension('commands.passive_income')
     await bot.load_extension('commands.avatar_tracker')
     await bot.load_extension('commands.status_tracker')
     await bot.load_extension('commands.activity_tracker')
     await bot.load_extension('commands.pfp_rotation')
     await bot.load_extension('commands.status_rotation')
     await bot.load_extension("commands.message_logger")
+    await bot.load_extension("commands.search_logs")
     await bot.load_extension("commands.analyze")
     await bot.load_extension("commands.generate")
     await bot.load_extension("commands.auto_banner")
@@ -0,0 +1,73 @@
+"""
+Rebuild every balance from the latest ledger snapshot plus the ledger tail.
+
+By default only reports users whose stored balance differs from the rebuilt one;
+--apply writes the rebuilt balances back. Stop the bot before applying, since
+changes it makes during the run would be overwritten.
+
+Run from the repository root:
+    python -m tools.rebuild_balances [--apply] [--user USER_ID]
+"""
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from utils.database import create_mongo_client
+from utils.ledger import replay
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="write rebuilt balances to the users collection")
+    parser.add_argument("--user", help="also print this user's ledger entries since the latest snapshot")
+    parser.add_argument("--guild", help="limit --user to one guild")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = create_mongo_client()
+    db = client["discord"]
+    try:
+        started = time.perf_counter()
+        balances, applied = await replay(db, batch_size=args.batch_size)
+        print(f"Rebuilt {len(balances)} balances from {applied} ledger entries in {time.perf_counter() - started:.2f}s")
+
+        if args.user:
+            latest = await db.balance_snapshots.find_one({}, sort=[("_id", -1)])
+            query = {"user_id": args.user}
+            if args.guild:
+                query["guild_id"] = args.guild
+            if latest:
+                query["_id"] = {"$gt": latest["_id"]}
+            async for entry in db.ledger.find(query).sort("_id", 1):
+                change = f"= {entry['set']}" if "set" in entry else f"{entry.get('delta', 0):+}"
+                print(f"  {entry['at']:%Y-%m-%d %H:%M:%S} {entry.get('guild_id')} {change:>10} {entry.get('reason', '')}")
+
+        # Stream every user once and compare with the rebuilt balance for the same (guild, user)
+        mismatches = []
+        async for user in db.users.find({}, {"guild_id": 1, "user_id": 1, "balance": 1}, batch_size=args.batch_size):
+            key = (user.get("guild_id"), user.get("user_id"))
+            if key in balances and user.get("balance", 0) != balances[key]:
+                mismatches.append((key, user.get("balance", 0), balances[key]))
+
+        for (guild_id, user_id), stored, expected in mismatches[:20]:
+            print(f"  {guild_id}/{user_id}: stored {stored}, ledger {expected}")
+        print(f"{len(mismatches)} mismatched balances")
+
+        if args.apply and mismatches:
+            operations = [
+                UpdateOne({"guild_id": guild_id, "user_id": user_id}, {"$set": {"balance": expected}})
+                for (guild_id, user_id), _, expected in mismatches
+            ]
+            for start in range(0, len(operations), args.batch_size):
+                await db.users.bulk_write(operations[start:start + args.batch_size], ordered=False)
+            print(f"Applied {len(mismatches)} rebuilt balances")
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+
+import discord
+from pymongo.errors import PyMongoError
+
+from utils.message_log import message_document
+
+
+class ChannelBackfill:
+    """
+    Crawls channel history into the message log to fill gaps left by downtime.
+
+    Each channel is read oldest-first from its checkpoint (the newest message id
+    already backfilled), a few channels at a time. Messages go through the bulk
+    ingest queue; the checkpoint only moves after a flush confirms the batch was
+    written, and snowflake _ids make any re-read after a restart a no-op.
+    """
+
+    def __init__(self, ingest, checkpoints, concurrency: int = 3, batch_size: int = 500, max_age_days: float = 30):
+        self.ingest = ingest
+        self.checkpoints = checkpoints
+        self.batch_size = batch_size
+        self.max_age_days = max_age_days  # How far back a channel without a checkpoint starts
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.task: Optional[asyncio.Task] = None
+        self.progress = {"channels_done": 0, "channels_total": 0, "messages": 0, "failed_channels": 0, "started_at": None, "elapsed": 0.0}
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self, channels: Iterable[discord.abc.Messageable], skip: Callable[[int], bool] = lambda _: False) -> bool:
+        """Start a crawl in the background; returns False if one is already running."""
+        if self.running:
+            return False
+        self.task = asyncio.create_task(self.run([c for c in channels if not skip(c.id)]))
+        return True
+
+    async def stop(self) -> None:
+        """
+        Cancel a running crawl; checkpoints already saved are kept.
+
+        Ingest flushes are shielded, so a crawl cancelled mid-commit still writes its
+        batch, and messages queued since stay in the ingest queue for its own stop().
+        At worst the checkpoint lags, and the next run re-reads a few pages.
+        """
+        if self.running:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self, channels) -> None:
+        started = time.perf_counter()
+        self.progress.update(channels_done=0, channels_total=len(channels), messages=0, failed_channels=0, started_at=datetime.now(timezone.utc))
+        await asyncio.gather(*(self._crawl(channel) for channel in channels))
+        self.progress["elapsed"] = time.perf_counter() - started
+        print(f"[Backfill] {self.progress['messages']} messages from {len(channels)} channels in {self.progress['elapsed']:.1f}s")
+
+    async def _crawl(self, channel) -> None:
+        async with self._semaphore:
+            try:
+                checkpoint = await self.checkpoints.find_one({"_id": channel.id})
+                if checkpoint:
+                    after = discord.Object(id=checkpoint["last_id"])
+                else:
+                    after = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+
+                pending = 0
+                last_id = None
+                # discord.py pages 100 messages per request and waits out 429s itself
+                async for message in channel.history(limit=None, after=after, oldest_first=True):
+                    last_id = message.id
+                    if message.author.bot:
+                        continue
+                    self.ingest.add(message_document(message))
+                    pending += 1
+                    if pending >= self.batch_size:
+                        if not await self._commit(channel.id, last_id, pending):
+                            return
+                        pending = 0
+
+                if last_id is not None:
+                    await self._commit(channel.id, last_id, pending)
+            except (discord.HTTPException, PyMongoError) as error:
+                self.progress["failed_channels"] += 1
+                print(f"[Backfill] Skipping #{getattr(channel, 'name', channel.id)}: {error}")
+            finally:
+                self.progress["channels_done"] += 1
+
+    async def _commit(self, channel_id: int, last_id: int, count: int) -> bool:
+        """Flush the queued batch, then advance the channel's checkpoint."""
+        if not await self.ingest.flush():
+            # Mongo is struggling; resume from the previous checkpoint on the next run
+            self.progress["failed_channels"] += 1
+            return False
+        await self.checkpoints.update_one(
+            {"_id": channel_id},
+            {"$set": {"last_id": last_id, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        self.progress["messages"] += count
+        return True
@@ -0,0 +1,16 @@
+import os
+
+from pymongo import AsyncMongoClient
+
+
+def create_mongo_client() -> AsyncMongoClient:
+    """Create the single async MongoDB client shared by every cog."""
+    return AsyncMongoClient(
+        os.getenv("MONGODB_URI"),
+        appname="moneybot",
+        maxPoolSize=int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+        minPoolSize=int(os.getenv("MONGODB_MIN_POOL_SIZE", "5")),
+        maxIdleTimeMS=int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+        serverSelectionTimeoutMS=int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        retryWrites=True,
+    )
@@ -0,0 +1,162 @@
+import os
+from typing import List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+# Fields returned by every operation so callers see the new state
+PROJECTION = {"_id": 0, "guild_id": 1, "user_id": 1, "balance": 1, "money_lost": 1}
+
+
+def guild_key(guild) -> str:
+    """Partition key for a guild, guild ID or None; DMs use the home guild from GUILD_ID."""
+    if guild is None:
+        return os.getenv("GUILD_ID", "0")
+    return str(getattr(guild, "id", guild))
+
+
+class Economy:
+    """
+    Atomic balance operations on the users collection, partitioned by guild.
+
+    Every debit is a single conditional $inc (the filter requires enough balance),
+    so concurrent commands can never overdraw or overwrite each other. Each applied
+    change is also recorded in the ledger with the reason it happened. Users are
+    keyed by (guild_id, user_id), so each guild has its own economy.
+    """
+
+    def __init__(self, db, leaderboard, ledger=None):
+        self.users = db["users"]
+        self.leaderboard = leaderboard
+        self.ledger = ledger
+
+    def _track(self, user: Optional[dict], guild_id: str, user_id: str, balance: int = 0, money_lost: int = 0) -> Optional[dict]:
+        """
+        Apply a change that was just written to the leaderboard as a delta.
+
+        The returned document doesn't include reaction rewards still queued in the
+        batcher, but the board already does, so it is never overwritten with it.
+        """
+        if user:
+            self.leaderboard.adjust(guild_id, user_id, balance=balance, money_lost=money_lost)
+        return user
+
+    def _record(self, user: Optional[dict], guild_id: str, user_id: str, delta: int = 0, reason: str = "", set_to: Optional[int] = None) -> None:
+        """Log an applied change; `user` is None when the conditional update matched nothing."""
+        if user and self.ledger:
+            self.ledger.record(guild_id, user_id, delta, reason, set_to=set_to)
+
+    async def debit(self, guild_id: str, user_id: str, amount: int, reason: str = "debit") -> Optional[dict]:
+        """Take `amount` from a user if they can afford it; returns the updated user or None."""
+        user = await self.users.find_one_and_update(
+            {"guild_id": guild_id, "user_id": user_id, "balance": {"$gte": amount}},
+            {"$inc": {"balance": -amount}},
+            projection=PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._record(user, guild_id, user_id, -amount, reason)
+        return self._track(user, guild_id, user_id, balance=-amount)
+
+    async def credit(self, guild_id: str, user_id: str, amount: int, reason: str = "credit") -> dict:
+        """Add `amount` to a user, creating them if needed; returns the updated user."""
+        user = await self.users.find_one_and_update(
+            {"guild_id": guild_id, "user_id": user_id},
+            {"$inc": {"balance": amount}},
+            projection=PROJECTION,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._record(user, guild_id, user_id, amount, reason)
+        return self._track(user, guild_id, user_id, balance=amount)
+
+    async def transfer(self, guild_id: str, sender_id: str, recipient_id: str, amount: int) -> Optional[Tuple[dict, dict]]:
+        """Move money between users in two round trips; returns (sender, recipient) or None if unaffordable."""
+        sender = await self.debit(guild_id, sender_id, amount, reason="give")
+        if sender is None:
+            return None
+        try:
+            recipient = await self.credit(guild_id, recipient_id, amount, reason="give")
+        except PyMongoError:
+            # Refund so the money is never lost between the two writes
+            await self.credit(guild_id, sender_id, amount, reason="refund")
+            raise
+        return sender, recipient
+
+    async def airdrop(self, guild_id: str, sender_id: str, recipient_ids: List[str], amount: int) -> Optional[Tuple[dict, List[str], List[str]]]:
+        """
+        Pay `amount` to every recipient with one debit and one unordered bulk upsert.
+
+        Returns (sender, credited ids, failed ids), or None if the sender can't cover
+        the total. Failed credits are refunded to the sender.
+        """
+        total = amount * len(recipient_ids)
+        sender = await self.debit(guild_id, sender_id, total, reason="airdrop")
+        if sender is None:
+            return None
+
+        operations = [UpdateOne({"guild_id": guild_id, "user_id": user_id}, {"$inc": {"balance": amount}}, upsert=True) for user_id in recipient_ids]
+        try:
+            await self.users.bulk_write(operations, ordered=False)
+            failed = []
+        except BulkWriteError as error:
+            # Unordered: everything except the reported operations was applied
+            failed = [recipient_ids[e["index"]] for e in error.details.get("writeErrors", [])]
+        except PyMongoError:
+            # Nothing acknowledged (retryable writes already retried once); give it all back
+            await self.credit(guild_id, sender_id, total, reason="refund")
+            raise
+
+        failed_set = set(failed)
+        credited = [user_id for user_id in recipient_ids if user_id not in failed_set]
+        for user_id in credited:
+            self.leaderboard.adjust(guild_id, user_id, balance=amount)
+            if self.ledger:
+                self.ledger.record(guild_id, user_id, amount, "airdrop")
+        if failed:
+            sender = await self.credit(guild_id, sender_id, amount * len(failed), reason="refund")
+        return sender, credited, failed
+
+    async def settle_bet(self, guild_id: str, user_id: str, amount: int, won: bool) -> Optional[dict]:
+        """Pay out or collect a bet in one round trip; returns the updated user or None if unaffordable."""
+        if won:
+            update = {"$inc": {"balance": amount}}
+        else:
+            update = {"$inc": {"balance": -amount, "money_lost": amount}}
+        user = await self.users.find_one_and_update(
+            {"guild_id": guild_id, "user_id": user_id, "balance": {"$gte": amount}},
+            update,
+            projection=PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._record(user, guild_id, user_id, amount if won else -amount, "coinflip")
+        if won:
+            return self._track(user, guild_id, user_id, balance=amount)
+        return self._track(user, guild_id, user_id, balance=-amount, money_lost=amount)
+
+    async def settle_flips(self, guild_id: str, user_id: str, net: int, lost: int, required: int) -> Optional[dict]:
+        """Commit a whole multi-flip session; `required` is the balance needed to afford every bet in it."""
+        update = {"$inc": {"balance": net}}
+        if lost:
+            update["$inc"]["money_lost"] = lost
+        user = await self.users.find_one_and_update(
+            {"guild_id": guild_id, "user_id": user_id, "balance": {"$gte": required}},
+            update,
+            projection=PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._record(user, guild_id, user_id, net, "coinflip")
+        return self._track(user, guild_id, user_id, balance=net, money_lost=lost)
+
+    async def set_balance(self, guild_id: str, user_id: str, amount: int) -> dict:
+        """Overwrite a user's balance, creating them if needed; returns the updated user."""
+        # The previous balance gives the delta the leaderboard needs
+        before = await self.users.find_one_and_update(
+            {"guild_id": guild_id, "user_id": user_id},
+            {"$set": {"balance": amount}},
+            projection=PROJECTION,
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        user = {**(before or {"guild_id": guild_id, "user_id": user_id}), "balance": amount}
+        self._record(user, guild_id, user_id, reason="setbalance", set_to=amount)
+        return self._track(user, guild_id, user_id, balance=amount - (before or {}).get("balance", 0))
@@ -0,0 +1,49 @@
+import random
+import time
+
+# Before the house was sharded, coinflip losses were paid to this user's balance
+LEGACY_HOUSE_USER_ID = "1263010002482757707"
+
+
+class HouseAccount:
+    """
+    The house treasury, spread over N counter documents.
+
+    Each credit picks a random shard so concurrent losses don't contend on one
+    document; the total is the sum of the shards, cached for a few seconds.
+    """
+
+    def __init__(self, collection, shards: int = 16, cache_ttl: float = 10):
+        self.collection = collection
+        self.shards = shards
+        self.cache_ttl = cache_ttl
+        self._total = None
+        self._total_expires = 0.0
+
+    async def credit(self, amount: int) -> None:
+        """Add `amount` to a random shard."""
+        shard = random.randrange(self.shards)
+        await self.collection.update_one({"_id": f"shard-{shard}"}, {"$inc": {"balance": amount}}, upsert=True)
+        if self._total is not None:
+            self._total += amount
+
+    async def total(self) -> int:
+        """Sum of all shards, served from cache while fresh."""
+        if self._total is None or time.monotonic() >= self._total_expires:
+            cursor = await self.collection.aggregate([{"$group": {"_id": None, "balance": {"$sum": "$balance"}}}])
+            result = await cursor.to_list(length=1)
+            self._total = result[0]["balance"] if result else 0
+            self._total_expires = time.monotonic() + self.cache_ttl
+        return self._total
+
+
+async def fold_legacy_house_balance(db) -> int:
+    """Move the old house user's balance into the sharded house account."""
+    user = await db.users.find_one_and_update(
+        {"user_id": LEGACY_HOUSE_USER_ID, "balance": {"$gt": 0}},
+        {"$set": {"balance": 0}},
+    )
+    if not user:
+        return 0
+    await db.house_account.update_one({"_id": "shard-0"}, {"$inc": {"balance": user["balance"]}}, upsert=True)
+    return user["balance"]
@@ -0,0 +1,85 @@
+import zlib
+from typing import List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+
+def retired_item_id(name: str) -> int:
+    """Stable negative item_id for legacy items that are no longer in the shop."""
+    return -(zlib.crc32(name.encode()) or 1)
+
+
+class Inventory:
+    """Owned items stored one document per (user_id, item_id) with a quantity counter."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def add(self, user_id: str, item: dict, quantity: int = 1) -> None:
+        """Add `quantity` of a shop item to a user's inventory."""
+        await self.collection.update_one(
+            {"user_id": user_id, "item_id": item["item_id"]},
+            {
+                "$inc": {"quantity": quantity},
+                "$set": {"name": item["name"], "price": item["price"]},
+            },
+            upsert=True,
+        )
+
+    async def page(self, user_id: str, after_item_id: Optional[int] = None, count: int = 5) -> List[dict]:
+        """Return up to `count` items after `after_item_id`, walking the (user_id, item_id) index."""
+        query = {"user_id": user_id}
+        if after_item_id is not None:
+            query["item_id"] = {"$gt": after_item_id}
+        cursor = self.collection.find(query, {"_id": 0}).sort("item_id", ASCENDING).limit(count)
+        return await cursor.to_list(length=count)
+
+    async def count(self, user_id: str) -> int:
+        """Number of distinct items a user owns."""
+        return await self.collection.count_documents({"user_id": user_id})
+
+
+async def migrate_embedded_inventories(db, batch_size: int = 500) -> int:
+    """
+    Move every users.inventory array into the inventory collection and unset it.
+
+    Quantities are $set from the array (not $inc), so re-running after an
+    interruption rewrites the same values instead of double counting.
+    """
+    item_ids = {item["name"]: item["item_id"] async for item in db.shop.find({}, {"name": 1, "item_id": 1})}
+    migrated = 0
+    batch_users = []
+    operations = []
+
+    async def write_batch():
+        if operations:
+            await db.inventory.bulk_write(operations, ordered=False)
+        await db.users.update_many({"user_id": {"$in": batch_users}}, {"$unset": {"inventory": ""}})
+
+    cursor = db.users.find({"inventory.0": {"$exists": True}}, {"user_id": 1, "inventory": 1}, batch_size=batch_size)
+    async for user in cursor:
+        owned = {}
+        for entry in user["inventory"]:
+            name = entry.get("name", "Unknown item")
+            item_id = item_ids.get(name, retired_item_id(name))
+            quantity, _, _ = owned.get(item_id, (0, name, 0))
+            owned[item_id] = (quantity + 1, name, entry.get("price", 0))
+
+        batch_users.append(user["user_id"])
+        for item_id, (quantity, name, price) in owned.items():
+            operations.append(UpdateOne(
+                {"user_id": user["user_id"], "item_id": item_id},
+                {"$set": {"quantity": quantity, "name": name, "price": price}},
+                upsert=True,
+            ))
+
+        if len(operations) >= batch_size:
+            await write_batch()
+            migrated += len(batch_users)
+            batch_users, operations = [], []
+
+    if batch_users:
+        await write_batch()
+        migrated += len(batch_users)
+
+    return migrated
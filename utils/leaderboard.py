@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from sortedcontainers import SortedList
+
+
+class Board:
+    """Order-statistics ranking of users by one value, highest first."""
+
+    def __init__(self):
+        self.values: Dict[str, int] = {}
+        self.order = SortedList()  # (-value, user_id) so index 0 is the top
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, user_id: str) -> Optional[int]:
+        return self.values.get(user_id)
+
+    def set(self, user_id: str, value: int) -> None:
+        """Set a user's value, re-ranking them in O(log n)."""
+        old = self.values.get(user_id)
+        if old == value:
+            return
+        if old is not None:
+            self.order.remove((-old, user_id))
+        self.values[user_id] = value
+        self.order.add((-value, user_id))
+
+    def add(self, user_id: str, delta: int) -> None:
+        """Add a delta to a user's value (starting from 0)."""
+        self.set(user_id, self.values.get(user_id, 0) + delta)
+
+    def top(self, count: int, start: int = 0) -> List[Tuple[str, int]]:
+        """Return (user_id, value) pairs for ranks start+1 .. start+count."""
+        return [(user_id, -negated) for negated, user_id in self.order.islice(start, start + count)]
+
+    def page(self, after: Optional[Tuple[int, str]] = None, count: int = 10) -> List[Tuple[str, int]]:
+        """Return the rows that follow the (value, user_id) keyset cursor `after`."""
+        start = 0 if after is None else self.order.bisect_right((-after[0], after[1]))
+        return self.top(count, start)
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based rank of a user, or None if they are not on the board."""
+        value = self.values.get(user_id)
+        if value is None:
+            return None
+        return self.order.index((-value, user_id)) + 1
+
+
+class Leaderboard:
+    """
+    Per-guild balance and money_lost rankings, loaded once into memory and updated in place.
+
+    Every change after the load is applied as a delta, never as an absolute value:
+    reaction rewards reach the board before the batcher writes them, so a balance
+    read back from Mongo can be behind the board.
+
+    With preloading disabled the same page and rank queries are answered from
+    Mongo instead, using keyset pagination over the (guild_id, field desc, user_id) indexes.
+    """
+
+    FIELDS = ("balance", "money_lost")
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.boards: Dict[str, Dict[str, Board]] = {field: {} for field in self.FIELDS}  # field -> guild_id -> Board
+        self.loaded = False
+        self.loaded_at: Optional[ObjectId] = None  # Taken just before the load; later ops aren't in the boards
+        self.applied_ops = set()  # Bulk op ids already applied since the load
+
+    def board(self, guild_id: str, field: str) -> Board:
+        boards = self.boards[field]
+        if guild_id not in boards:
+            boards[guild_id] = Board()
+        return boards[guild_id]
+
+    async def load(self) -> None:
+        """Stream every user's balance and losses from the database into the boards."""
+        self.loaded_at = ObjectId()
+        cursor = self.collection.find(
+            {}, {"_id": 0, "guild_id": 1, "user_id": 1, "balance": 1, "money_lost": 1}, batch_size=1000
+        )
+        async for user in cursor:
+            user_id = user.get("user_id")
+            guild_id = user.get("guild_id")
+            if user_id is None or guild_id is None:
+                continue
+            self.board(guild_id, "balance").set(user_id, user.get("balance", 0))
+            if "money_lost" in user:
+                self.board(guild_id, "money_lost").set(user_id, user["money_lost"])
+        self.loaded = True
+
+    async def page(self, guild_id: str, field: str, after: Optional[Tuple[int, str]] = None, count: int = 10) -> List[Tuple[str, int]]:
+        """Return up to `count` (user_id, value) rows after the keyset cursor `after`."""
+        if self.loaded:
+            return self.board(guild_id, field).page(after, count)
+
+        query = {"guild_id": guild_id, field: {"$exists": True}}
+        if after is not None:
+            value, user_id = after
+            query = {"guild_id": guild_id, "$or": [{field: {"$lt": value}}, {field: value, "user_id": {"$gt": user_id}}]}
+        cursor = (
+            self.collection.find(query, {"_id": 0, "user_id": 1, field: 1})
+            .sort([(field, DESCENDING), ("user_id", ASCENDING)])
+            .limit(count)
+        )
+        return [(user["user_id"], user[field]) async for user in cursor]
+
+    async def rank(self, guild_id: str, field: str, user_id: str, value: Optional[int] = None) -> Optional[int]:
+        """1-based rank of a user; falls back to an index-backed count when not preloaded."""
+        if self.loaded:
+            return self.board(guild_id, field).rank(user_id)
+        if value is None:
+            user = await self.collection.find_one({"guild_id": guild_id, "user_id": user_id}, {field: 1})
+            if not user or field not in user:
+                return None
+            value = user[field]
+        ahead = await self.collection.count_documents(
+            {"guild_id": guild_id, "$or": [{field: {"$gt": value}}, {field: value, "user_id": {"$lt": user_id}}]}
+        )
+        return ahead + 1
+
+    async def size(self, guild_id: str, field: str) -> int:
+        """Number of users on a guild's board."""
+        if self.loaded:
+            return len(self.board(guild_id, field))
+        return await self.collection.count_documents({"guild_id": guild_id, field: {"$exists": True}})
+
+    def missed(self, op_id: ObjectId) -> bool:
+        """Whether a bulk write tagged `op_id` still has to be applied to the boards."""
+        return self.loaded and op_id > self.loaded_at and op_id not in self.applied_ops
+
+    def adjust(self, guild_id: str, user_id: str, balance: int = 0, money_lost: int = 0) -> None:
+        """Apply balance and/or money_lost deltas to a user."""
+        if not self.loaded:
+            return
+        if balance:
+            self.board(guild_id, "balance").add(user_id, balance)
+        if money_lost:
+            self.board(guild_id, "money_lost").add(user_id, money_lost)
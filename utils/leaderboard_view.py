@@ -0,0 +1,86 @@
+import discord
+from discord.ui import Button, View
+
+PAGE_SIZE = 10
+
+
+class LeaderboardView(View):
+    """Previous/Next navigation over a keyset-paginated leaderboard."""
+
+    def __init__(self, bot, guild_id: str, field: str, title: str, color: int, viewer_id: str):
+        super().__init__(timeout=300)
+        self.bot = bot
+        self.guild_id = guild_id
+        self.field = field
+        self.title = title
+        self.color = color
+        self.viewer_id = viewer_id
+        self.cursors = [None]  # Keyset cursor each visited page starts after
+        self.page_index = 0
+        self.rows = []
+
+        self.previous_button = Button(label="Previous", style=discord.ButtonStyle.primary)
+        self.previous_button.callback = self.on_previous_button_click
+        self.next_button = Button(label="Next", style=discord.ButtonStyle.primary)
+        self.next_button.callback = self.on_next_button_click
+        self.add_item(self.previous_button)
+        self.add_item(self.next_button)
+
+    async def load_page(self) -> None:
+        """Fetch the rows for the current page (one extra to know if there is a next page)."""
+        rows = await self.bot.leaderboard.page(self.guild_id, self.field, self.cursors[self.page_index], PAGE_SIZE + 1)
+        self.rows = rows[:PAGE_SIZE]
+        self.previous_button.disabled = self.page_index == 0
+        self.next_button.disabled = len(rows) <= PAGE_SIZE
+
+    async def build_embed(self) -> discord.Embed:
+        """Build the embed for the current page."""
+        embed = discord.Embed(title=f"{self.title} (Page {self.page_index + 1})", color=self.color)
+        if self.field == "balance":
+            # Cached sum of the house shards, no scan of users
+            embed.description = f"🏦 House treasury: ${await self.bot.house.total()}"
+
+        # Resolve every row's profile at once instead of one fetch per row
+        profiles = await self.bot.user_resolver.resolve_many(int(user_id) for user_id, _ in self.rows)
+        start_rank = self.page_index * PAGE_SIZE + 1
+        for rank, (user_id, value) in enumerate(self.rows, start=start_rank):
+            profile = profiles[int(user_id)]
+
+            # Build the mention or fallback to just the user ID
+            user_mention = profile.tag if profile else f"<@{user_id}>"
+            embed.add_field(name=f"{rank}. {user_mention}", value=f"${value}", inline=False)
+
+        rank = await self.bot.leaderboard.rank(self.guild_id, self.field, self.viewer_id)
+        if rank:
+            embed.set_footer(text=f"Your rank: #{rank} of {await self.bot.leaderboard.size(self.guild_id, self.field)}")
+        return embed
+
+    async def on_next_button_click(self, interaction: discord.Interaction):
+        if self.next_button.disabled:
+            return await interaction.response.defer()
+        user_id, value = self.rows[-1]
+        del self.cursors[self.page_index + 1:]
+        self.cursors.append((value, user_id))
+        self.page_index += 1
+        await interaction.response.defer()
+        await self.load_page()
+        await interaction.edit_original_response(embed=await self.build_embed(), view=self)
+
+    async def on_previous_button_click(self, interaction: discord.Interaction):
+        if self.page_index == 0:
+            return await interaction.response.defer()
+        self.page_index -= 1
+        await interaction.response.defer()
+        await self.load_page()
+        await interaction.edit_original_response(embed=await self.build_embed(), view=self)
+
+
+async def build_window_embed(bot, rows, title: str, color: int) -> discord.Embed:
+    """Build the embed for a daily/weekly rollup board."""
+    embed = discord.Embed(title=title, color=color)
+    profiles = await bot.user_resolver.resolve_many(int(user_id) for user_id, _ in rows)
+    for rank, (user_id, value) in enumerate(rows, start=1):
+        profile = profiles[int(user_id)]
+        user_mention = profile.tag if profile else f"<@{user_id}>"
+        embed.add_field(name=f"{rank}. {user_mention}", value=f"${value}", inline=False)
+    return embed
@@ -0,0 +1,190 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from discord.ext import tasks
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from utils.write_behind import WriteBehindBuffer
+
+
+class Ledger(WriteBehindBuffer):
+    """
+    Append-only record of every balance change, written behind in batches.
+
+    Each entry is {guild_id, user_id, delta, reason} (or `set` instead of `delta`
+    for an overwrite) with a client-generated ObjectId, so entries sort in the order
+    they were recorded. Snapshots fold the ledger up to a cutoff id into one
+    balance per (guild, user); a rebuild replays only what came after the latest one.
+    """
+
+    def __init__(self, db, max_batch: int = 500, flush_interval: float = 2.0, snapshot_interval: float = 24, keep_snapshots: int = 3):
+        super().__init__(max_batch, flush_interval)
+        self.db = db
+        self.entries = db["ledger"]
+        self.snapshot_interval = snapshot_interval  # Hours between snapshots
+        self.keep_snapshots = keep_snapshots
+        self._entries: List[dict] = []
+        self.stats.update(entries=0, snapshots=0, last_snapshot_ms=0.0)
+
+    def start(self) -> None:
+        """Start the periodic flush and snapshot loops."""
+        super().start()
+        self._snapshot_loop.change_interval(hours=self.snapshot_interval)
+        self._snapshot_loop.start()
+
+    async def stop(self) -> None:
+        """Stop both loops and write out everything still buffered."""
+        self._snapshot_loop.cancel()
+        await super().stop()
+
+    def record(self, guild_id: str, user_id: str, delta: int = 0, reason: str = "", set_to: Optional[int] = None, op_key: Optional[str] = None) -> None:
+        """Queue a ledger entry; `op_key` makes the entry idempotent (a repeat is dropped)."""
+        entry = {"_id": ObjectId(), "guild_id": guild_id, "user_id": user_id, "reason": reason, "at": datetime.now(timezone.utc)}
+        if set_to is not None:
+            entry["set"] = set_to
+        else:
+            entry["delta"] = delta
+        if op_key:
+            entry["op_key"] = op_key
+        self._entries.append(entry)
+        self._flush_when_full()
+
+    @property
+    def pending(self) -> int:
+        return len(self._entries)
+
+    async def _write(self) -> Optional[bool]:
+        """Insert all buffered entries in one unordered insert_many."""
+        if not self._entries:
+            return None
+        entries, self._entries = self._entries, []
+        try:
+            await self.entries.insert_many(entries, ordered=False)
+        except BulkWriteError as error:
+            # Duplicate ids/op_keys were already written; retry anything else
+            failed = [e["index"] for e in error.details.get("writeErrors", []) if e.get("code") != 11000]
+            if failed:
+                print(f"[Ledger] {len(failed)} of {len(entries)} entries failed: {error}")
+                self._entries[:0] = [entries[i] for i in failed]
+                return False
+        except PyMongoError as error:
+            print(f"[Ledger] Flush of {len(entries)} entries failed: {error}")
+            self._entries[:0] = entries
+            return False
+        self.stats["entries"] += len(entries)
+        return True
+
+    async def snapshot(self, batch_size: int = 1000) -> Optional[ObjectId]:
+        """Fold the previous snapshot and the ledger since then into a new snapshot."""
+        started = time.perf_counter()
+        # Every entry recorded before the cutoff is in the buffer now and gets written by this flush
+        cutoff = ObjectId()
+        await self.flush()
+        if any(entry["_id"] <= cutoff for entry in self._entries):
+            print("[Ledger] Skipping snapshot: entries before the cutoff are still unwritten")
+            return None
+
+        balances, applied = await replay(self.db, until=cutoff, batch_size=batch_size)
+        await write_snapshot(self.db, cutoff, balances, applied, batch_size)
+        await prune_snapshots(self.db, self.keep_snapshots)
+
+        self.stats["snapshots"] += 1
+        self.stats["last_snapshot_ms"] = (time.perf_counter() - started) * 1000
+        return cutoff
+
+    @tasks.loop(hours=24)  # Placeholder; interval is set from snapshot_interval in start()
+    async def _snapshot_loop(self):
+        try:
+            await self.snapshot()
+        except PyMongoError as error:
+            print(f"[Ledger] Snapshot failed: {error}")
+
+    @_snapshot_loop.before_loop
+    async def _before_snapshot(self):
+        # tasks.loop fires immediately, so wait out what is left of the interval since the
+        # latest snapshot; restarts don't push snapshots back, and an overdue one runs now
+        try:
+            latest = await self.db.balance_snapshots.find_one({}, {"taken_at": 1}, sort=[("_id", -1)])
+        except PyMongoError as error:
+            print(f"[Ledger] Could not read the latest snapshot: {error}")
+            latest = None
+        if latest is None:
+            return
+        taken_at = latest["taken_at"]
+        if taken_at.tzinfo is None:
+            taken_at = taken_at.replace(tzinfo=timezone.utc)  # The client returns naive UTC datetimes
+        remaining = self.snapshot_interval * 3600 - (datetime.now(timezone.utc) - taken_at).total_seconds()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+
+async def replay(db, until: Optional[ObjectId] = None, batch_size: int = 1000):
+    """
+    Rebuild balances from the latest snapshot plus the ledger tail after it.
+
+    Both are streamed with batched cursors in _id order; returns (balances keyed by
+    (guild_id, user_id), entries applied).
+    """
+    balances: Dict[Tuple[str, str], int] = {}
+    entries = {}
+    latest = await db.balance_snapshots.find_one({}, sort=[("_id", -1)])
+    if latest:
+        rows = db.balance_snapshot_rows.find({"snapshot_id": latest["_id"]}, {"_id": 0, "guild_id": 1, "user_id": 1, "balance": 1}, batch_size=batch_size)
+        async for row in rows:
+            balances[(row.get("guild_id"), row["user_id"])] = row["balance"]
+        entries["$gt"] = latest["_id"]
+    if until is not None:
+        entries["$lte"] = until
+
+    applied = 0
+    query = {"_id": entries} if entries else {}
+    cursor = db.ledger.find(query, {"guild_id": 1, "user_id": 1, "delta": 1, "set": 1}, batch_size=batch_size).sort("_id", ASCENDING)
+    async for entry in cursor:
+        key = (entry.get("guild_id"), entry["user_id"])
+        if "set" in entry:
+            balances[key] = entry["set"]
+        else:
+            balances[key] = balances.get(key, 0) + entry.get("delta", 0)
+        applied += 1
+    return balances, applied
+
+
+async def write_snapshot(db, snapshot_id: ObjectId, balances: Dict[Tuple[str, str], int], entries: int, batch_size: int = 1000) -> None:
+    """Write snapshot rows, then the header that marks the snapshot complete."""
+    rows = [
+        {"snapshot_id": snapshot_id, "guild_id": guild_id, "user_id": user_id, "balance": balance}
+        for (guild_id, user_id), balance in balances.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        await db.balance_snapshot_rows.insert_many(rows[start:start + batch_size], ordered=False)
+    await db.balance_snapshots.insert_one({
+        "_id": snapshot_id,
+        "taken_at": datetime.now(timezone.utc),
+        "users": len(rows),
+        "entries": entries,
+    })
+
+
+async def prune_snapshots(db, keep: int) -> None:
+    """Drop all but the newest `keep` snapshots, plus rows left behind by interrupted ones."""
+    kept = [doc["_id"] async for doc in db.balance_snapshots.find({}, {"_id": 1}).sort("_id", -1).limit(keep)]
+    if not kept:
+        return
+    await db.balance_snapshots.delete_many({"_id": {"$nin": kept}})
+    await db.balance_snapshot_rows.delete_many({"snapshot_id": {"$nin": kept}})
+
+
+async def genesis_snapshot(db, batch_size: int = 1000) -> int:
+    """Snapshot the current balances so the ledger has a starting point; runs before any ledger writes."""
+    if await db.balance_snapshots.find_one({}, {"_id": 1}):
+        return 0
+    snapshot_id = ObjectId()
+    balances = {}
+    async for user in db.users.find({"user_id": {"$exists": True}}, {"guild_id": 1, "user_id": 1, "balance": 1}, batch_size=batch_size):
+        balances[(user.get("guild_id"), user["user_id"])] = user.get("balance", 0)
+    await write_snapshot(db, snapshot_id, balances, 0, batch_size)
+    return len(balances)
@@ -0,0 +1,61 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class MessageAuthors:
+    """
+    message_id -> author_id for recent messages, so reactions can be paid without fetching the message.
+
+    Fed by the message logger as messages arrive; misses fall back to a point
+    lookup on the message log's snowflake _id and the answer is cached. Messages
+    that aren't logged are remembered as missing for `miss_ttl` seconds, so
+    repeated reactions on them don't each cost a lookup.
+    """
+
+    def __init__(self, collection, max_size: int = 100_000, miss_ttl: float = 300):
+        self.collection = collection
+        self.max_size = max_size
+        self.miss_ttl = miss_ttl
+        self._authors: "OrderedDict[int, int]" = OrderedDict()
+        self._missing: "OrderedDict[int, float]" = OrderedDict()  # message_id -> when the miss expires
+        self.stats = {"hits": 0, "lookups": 0, "misses": 0, "cached_misses": 0}
+
+    def remember(self, message_id: int, author_id: int) -> None:
+        self._missing.pop(message_id, None)
+        self._authors[message_id] = author_id
+        self._authors.move_to_end(message_id)
+        if len(self._authors) > self.max_size:
+            self._authors.popitem(last=False)
+
+    def cached(self, message_id: int) -> Optional[int]:
+        """The author if it is already in memory; never touches the database."""
+        author_id = self._authors.get(message_id)
+        if author_id is not None:
+            self._authors.move_to_end(message_id)
+            self.stats["hits"] += 1
+        return author_id
+
+    async def author_of(self, message_id: int) -> Optional[int]:
+        """The author of a message, or None if it was never seen or logged."""
+        author_id = self.cached(message_id)
+        if author_id is not None:
+            return author_id
+
+        expires = self._missing.get(message_id)
+        if expires is not None:
+            if expires > time.monotonic():
+                self.stats["cached_misses"] += 1
+                return None
+            del self._missing[message_id]
+
+        self.stats["lookups"] += 1
+        logged = await self.collection.find_one({"_id": message_id}, {"_id": 0, "author_id": 1})
+        if logged is None:
+            self.stats["misses"] += 1
+            self._missing[message_id] = time.monotonic() + self.miss_ttl
+            if len(self._missing) > self.max_size:
+                self._missing.popitem(last=False)
+            return None
+        self.remember(message_id, logged["author_id"])
+        return logged["author_id"]
@@ -0,0 +1,164 @@
+import asyncio
+import os
+from typing import List, Optional
+
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from utils.write_behind import WriteBehindBuffer
+
+
+class MessageIngest(WriteBehindBuffer):
+    """
+    Bounded write-behind queue for logged messages, flushed with insert_many(ordered=False).
+
+    Flushes when `max_batch` documents are waiting or every `flush_interval` seconds.
+    If Mongo falls behind and `max_queue` documents pile up, the backlog is spilled
+    to a local JSON-lines file instead of growing without bound, and replayed once
+    writes succeed again, `max_batch` lines at a time. Every document gets its _id
+    on arrival, so retries and replays can never insert a message twice.
+    """
+
+    def __init__(self, collection, max_batch: int = 500, flush_interval: float = 2.0, max_queue: int = 10_000, spill_path: str = "message_spill.jsonl"):
+        super().__init__(max_batch, flush_interval)
+        self.collection = collection
+        self.max_queue = max_queue
+        self.spill_path = spill_path
+        self.offset_path = spill_path + ".offset"  # Bytes of the spill file already replayed
+        self._queue: List[dict] = []
+        self._spill_lock = asyncio.Lock()
+        self._spill_task = None
+        self.stats.update(received=0, written=0, spilled=0, replayed=0, max_depth=0)
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything queued; spill whatever still fails."""
+        if self._spill_task and not self._spill_task.done():
+            await self._spill_task
+        await super().stop()
+        if self._queue:
+            await self._spill(self._take_all())
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def add(self, document: dict) -> None:
+        """Queue a message document; never waits on Mongo."""
+        document.setdefault("_id", ObjectId())
+        self._queue.append(document)
+        self.stats["received"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._queue))
+
+        if len(self._queue) >= self.max_queue and (self._spill_task is None or self._spill_task.done()):
+            # Mongo is falling behind: move the backlog to disk
+            self._spill_task = asyncio.create_task(self._spill(self._take_all()))
+        else:
+            self._flush_when_full()
+
+    def _take_all(self) -> List[dict]:
+        documents, self._queue = self._queue, []
+        return documents
+
+    async def _write(self) -> Optional[bool]:
+        if not self._queue:
+            await self._replay_spill()
+            return None
+        documents = self._take_all()
+
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as error:
+            # Duplicate _ids were written by an earlier attempt; retry anything else
+            failed = [documents[e["index"]] for e in error.details.get("writeErrors", []) if e.get("code") != 11000]
+            if failed:
+                print(f"[MessageIngest] {len(failed)} of {len(documents)} messages failed: {error}")
+                self._queue[:0] = failed
+                return False
+        except PyMongoError as error:
+            print(f"[MessageIngest] Flush of {len(documents)} messages failed: {error}")
+            self._queue[:0] = documents
+            return False
+        self.stats["written"] += len(documents)
+
+        # Mongo is keeping up again, so bring back anything spilled earlier
+        await self._replay_spill()
+        return True
+
+    async def _spill(self, documents: List[dict]) -> None:
+        """Append documents to the spill file off the event loop."""
+        if not documents:
+            return
+        lines = "".join(json_util.dumps(document) + "\n" for document in documents)
+
+        def write():
+            with open(self.spill_path, "a", encoding="utf-8") as spill:
+                spill.write(lines)
+
+        async with self._spill_lock:
+            await asyncio.to_thread(write)
+        self.stats["spilled"] += len(documents)
+        print(f"[MessageIngest] Spilled {len(documents)} messages to {self.spill_path}")
+
+    def _read_batch(self, offset: int):
+        """Up to max_batch documents starting at byte `offset`, and the offset after them."""
+        documents = []
+        with open(self.spill_path, "rb") as spill:
+            spill.seek(offset)
+            while len(documents) < self.max_batch:
+                line = spill.readline()
+                if not line:
+                    break
+                if line.strip():
+                    documents.append(json_util.loads(line.decode("utf-8")))
+            return documents, spill.tell()
+
+    def _load_offset(self) -> int:
+        try:
+            with open(self.offset_path, encoding="utf-8") as saved:
+                return int(saved.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _save_offset(self, offset: int) -> None:
+        with open(self.offset_path, "w", encoding="utf-8") as saved:
+            saved.write(str(offset))
+
+    def _remove_spill(self) -> None:
+        os.remove(self.spill_path)
+        if os.path.exists(self.offset_path):
+            os.remove(self.offset_path)
+
+    async def _replay_spill(self) -> None:
+        """
+        Stream spilled messages back in max_batch chunks, then remove the file.
+
+        Only one chunk is in memory at a time. The offset of the last written
+        chunk is saved next to the file, so an interrupted replay resumes there.
+        """
+        if not os.path.exists(self.spill_path):
+            return
+
+        async with self._spill_lock:
+            offset = await asyncio.to_thread(self._load_offset)
+            while True:
+                batch, next_offset = await asyncio.to_thread(self._read_batch, offset)
+                if not batch:
+                    break
+                try:
+                    await self.collection.insert_many(batch, ordered=False)
+                except BulkWriteError as error:
+                    if any(e.get("code") != 11000 for e in error.details.get("writeErrors", [])):
+                        print(f"[MessageIngest] Replay of {self.spill_path} stopped: {error}")
+                        return
+                except PyMongoError as error:
+                    # Keep the file; the next replay starts from the saved offset
+                    print(f"[MessageIngest] Replay of {self.spill_path} stopped: {error}")
+                    return
+                self.stats["replayed"] += len(batch)
+                offset = next_offset
+                await asyncio.to_thread(self._save_offset, offset)
+            await asyncio.to_thread(self._remove_spill)
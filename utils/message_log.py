@@ -0,0 +1,190 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+import discord
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError
+
+# Logged messages keyed by snowflake; _id order is time order
+COLLECTION = "message_log"
+
+# How far back the first window of a keyword search reaches; later windows double
+SEARCH_WINDOW = timedelta(days=30)
+DISCORD_EPOCH = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+
+def message_document(message: discord.Message) -> dict:
+    """The message_log document for a Discord message."""
+    document = {
+        "_id": message.id,
+        "author_id": message.author.id,
+        "channel_id": message.channel.id,
+        "guild_id": message.guild.id if message.guild else None,
+        "content": message.content,
+        "timestamp": message.created_at,
+    }
+    # Public threads are readable by anyone who can read the parent, even once archived
+    if isinstance(message.channel, discord.Thread) and not message.channel.is_private():
+        document["parent_id"] = message.channel.parent_id
+    return document
+
+
+def _parse_timestamp(value, message_id: int) -> datetime:
+    """Old entries stored an ISO string (naive UTC); fall back to the snowflake time."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return discord.utils.snowflake_time(message_id)
+
+
+async def migrate_messages(db, batch_size: int = 1000) -> int:
+    """
+    Stream the old messages collection into message_log.
+
+    Inserts are unordered and keyed by snowflake, so an interrupted run is simply
+    repeated: already-copied messages are rejected as duplicates. The old
+    collection is left in place for the operator to drop once satisfied.
+    """
+    copied = 0
+    batch = []
+
+    async def write_batch():
+        nonlocal copied
+        try:
+            result = await db[COLLECTION].insert_many(batch, ordered=False)
+            copied += len(result.inserted_ids)
+        except BulkWriteError as error:
+            if any(e.get("code") != 11000 for e in error.details.get("writeErrors", [])):
+                raise
+            copied += error.details.get("nInserted", 0)
+
+    cursor = db.messages.find({"message_id": {"$exists": True}}, batch_size=batch_size)
+    async for message in cursor:
+        message_id = int(message["message_id"])
+        batch.append({
+            "_id": message_id,
+            "author_id": message.get("author_id"),
+            "channel_id": message.get("channel_id"),
+            "guild_id": message.get("guild_id"),
+            "content": message.get("content", ""),
+            "timestamp": _parse_timestamp(message.get("timestamp"), message_id),
+        })
+        if len(batch) >= batch_size:
+            await write_batch()
+            batch = []
+
+    if batch:
+        await write_batch()
+    return copied
+
+
+async def assign_message_guilds(db) -> int:
+    """
+    Give messages logged before guild_id was recorded the home guild.
+
+    Searches are scoped by guild (the text index is prefixed by guild_id), so
+    without this the old log would never match. Without GUILD_ID the old
+    messages are left alone; they just stay out of search results.
+    """
+    guild_id = os.getenv("GUILD_ID")
+    if not guild_id:
+        return 0
+    result = await db[COLLECTION].update_many({"guild_id": None}, {"$set": {"guild_id": int(guild_id)}})
+    return result.modified_count
+
+
+def search_filter(
+    guild_id: int,
+    keywords: Optional[str] = None,
+    phrase: Optional[str] = None,
+    author_id: Optional[int] = None,
+    channel_ids: Optional[Iterable[int]] = None,
+    parent_ids: Optional[Iterable[int]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict:
+    """
+    The message_log query for a search.
+
+    Every keyword must appear (a leading "-" excludes it) and the phrase must
+    appear verbatim; both go through the (guild_id, content, _id) text index.
+    Dates become snowflake bounds on _id, so they never need their own index.
+    Messages match if they are in `channel_ids` or in a public thread under
+    one of `parent_ids`.
+    """
+    query = {"guild_id": guild_id}
+
+    terms = [word if word.startswith("-") else f'"{word}"' for word in (keywords or "").replace('"', " ").split()]
+    if phrase and phrase.strip():
+        terms.append('"' + phrase.replace('"', " ").strip() + '"')
+    if terms:
+        query["$text"] = {"$search": " ".join(terms)}
+
+    if author_id is not None:
+        query["author_id"] = author_id
+    if channel_ids is not None:
+        in_channels = {"channel_id": {"$in": list(channel_ids)}}
+        parent_ids = list(parent_ids or [])
+        query.update({"$or": [in_channels, {"parent_id": {"$in": parent_ids}}]} if parent_ids else in_channels)
+
+    bounds = {}
+    if since:
+        bounds["$gte"] = discord.utils.time_snowflake(since)
+    if until:
+        bounds["$lt"] = discord.utils.time_snowflake(until)
+    if bounds:
+        query["_id"] = bounds
+    return query
+
+
+async def _find_page(collection, query: dict, count: int, max_time_ms: int) -> List[dict]:
+    cursor = (
+        collection.find(query, {"author_id": 1, "channel_id": 1, "content": 1})
+        .sort("_id", DESCENDING)
+        .limit(count)
+        .max_time_ms(max_time_ms)
+    )
+    return await cursor.to_list(length=count)
+
+
+async def search_page(
+    collection,
+    query: dict,
+    before_id: Optional[int] = None,
+    count: int = 10,
+    window: timedelta = SEARCH_WINDOW,
+    max_time_ms: int = 5000,
+) -> List[dict]:
+    """
+    Up to `count` matches older than `before_id`, newest first.
+
+    Pages are keyset cursors on the snowflake _id. A text match has no _id
+    order to walk, so keyword searches look at one time window at a time:
+    `window` back from the cursor, then twice as far back each time the page
+    isn't full yet. The window is checked against the _id suffix of the text
+    index, so only matches inside it are fetched and sorted. Raises pymongo's
+    ExecutionTimeout if a query is still too broad.
+    """
+    bounds = dict(query.get("_id", {}))
+    if before_id is not None:
+        bounds["$lt"] = min(before_id, bounds.get("$lt", before_id))
+
+    if "$text" not in query:
+        return await _find_page(collection, {**query, "_id": bounds} if bounds else query, count, max_time_ms)
+
+    floor = bounds.get("$gte", 0)
+    upper = bounds.get("$lt")
+    upper_at = discord.utils.snowflake_time(upper) if upper is not None else datetime.now(timezone.utc)
+    rows = []
+    while len(rows) < count:
+        lower_at = upper_at - window
+        lower = max(floor, discord.utils.time_snowflake(lower_at)) if lower_at > DISCORD_EPOCH else floor
+        window_bounds = {"$gte": lower} if upper is None else {"$gte": lower, "$lt": upper}
+        rows += await _find_page(collection, {**query, "_id": window_bounds}, count - len(rows), max_time_ms)
+        if lower <= floor:
+            break
+        upper, upper_at, window = lower, lower_at, window * 2
+    return rows
@@ -0,0 +1,212 @@
+import os
+import time
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
+
+from utils.house import fold_legacy_house_balance
+from utils.inventory import migrate_embedded_inventories
+from utils.ledger import genesis_snapshot
+from utils.message_log import assign_message_guilds, migrate_messages
+from utils.reaction_claims import drain_reacted_messages
+from utils.shop_catalog import assign_item_ids
+
+# Every index the bot relies on: (collection, keys, options)
+INDEXES = [
+    ("users", [("guild_id", ASCENDING), ("user_id", ASCENDING)], {"unique": True, "name": "guild_user_unique"}),
+    ("users", [("guild_id", ASCENDING), ("balance", DESCENDING), ("user_id", ASCENDING)], {"name": "guild_balance_rank"}),
+    ("users", [("guild_id", ASCENDING), ("money_lost", DESCENDING), ("user_id", ASCENDING)], {"name": "guild_money_lost_rank"}),
+    ("reaction_claims", [("reactor_id", ASCENDING), ("message_id", ASCENDING)], {"unique": True, "name": "reactor_message_unique"}),
+    # Snowflake _id covers time order and message lookups; one compound index serves "latest by author"
+    ("message_log", [("author_id", ASCENDING), ("_id", DESCENDING)], {"name": "author_recent"}),
+    ("message_log", [("channel_id", ASCENDING), ("_id", DESCENDING)], {"name": "channel_recent"}),
+    ("message_log", [("guild_id", ASCENDING), ("_id", DESCENDING)], {"name": "guild_recent"}),
+    # /searchlogs: guild equality prefix keeps each search inside one guild's postings, and the _id suffix
+    # lets time windows be checked in the index before fetching; no stemming or stop words for chat
+    ("message_log", [("guild_id", ASCENDING), ("content", TEXT), ("_id", DESCENDING)], {"default_language": "none", "name": "guild_content_id_text"}),
+    ("shop", [("item_id", ASCENDING)], {"unique": True, "name": "item_id_unique"}),
+    ("inventory", [("user_id", ASCENDING), ("item_id", ASCENDING)], {"unique": True, "name": "user_item_unique"}),
+    ("ledger", [("op_key", ASCENDING)], {"unique": True, "sparse": True, "name": "op_key_unique"}),
+    ("ledger", [("user_id", ASCENDING), ("_id", ASCENDING)], {"name": "user_history"}),
+    ("earnings_rollups", [("guild_id", ASCENDING), ("period", ASCENDING), ("bucket", ASCENDING), ("user_id", ASCENDING)], {"unique": True, "name": "guild_period_bucket_user_unique"}),
+    ("earnings_rollups", [("guild_id", ASCENDING), ("period", ASCENDING), ("bucket", ASCENDING), ("earned", DESCENDING)], {"name": "guild_bucket_earned"}),
+    ("earnings_rollups", [("guild_id", ASCENDING), ("period", ASCENDING), ("bucket", ASCENDING), ("lost", DESCENDING)], {"name": "guild_bucket_lost"}),
+    ("earnings_rollups", [("period", ASCENDING), ("bucket", ASCENDING)], {"name": "period_bucket"}),
+    ("earnings_rollups", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0, "name": "expires_at_ttl"}),
+    ("balance_snapshot_rows", [("snapshot_id", ASCENDING), ("guild_id", ASCENDING), ("user_id", ASCENDING)], {"unique": True, "name": "snapshot_guild_user_unique"}),
+]
+
+# Global indexes replaced by the guild-partitioned ones above: (collection, name)
+LEGACY_INDEXES = [
+    ("users", "user_id_unique"),
+    ("users", "balance_rank"),
+    ("users", "money_lost_rank"),
+    ("earnings_rollups", "period_bucket_user_unique"),
+    ("earnings_rollups", "bucket_earned"),
+    ("earnings_rollups", "bucket_lost"),
+    ("balance_snapshot_rows", "snapshot_user_unique"),
+]
+
+# Collections whose documents are partitioned by guild_id
+PARTITIONED = ("users", "ledger", "balance_snapshot_rows", "earnings_rollups")
+
+# Representative hot queries checked with explain() after startup: (collection, filter, sort)
+PLAN_CHECKS = [
+    ("users", {"guild_id": "0", "user_id": "0"}, None),
+    ("users", {"guild_id": "0"}, [("balance", DESCENDING), ("user_id", ASCENDING)]),
+    ("users", {"guild_id": "0", "money_lost": {"$exists": True}}, [("money_lost", DESCENDING), ("user_id", ASCENDING)]),
+    ("reaction_claims", {"reactor_id": "0", "message_id": "0"}, None),
+    ("message_log", {"author_id": 0}, [("_id", DESCENDING)]),
+    ("message_log", {}, [("_id", DESCENDING)]),
+    ("message_log", {"guild_id": 0, "channel_id": 0}, [("_id", DESCENDING)]),
+    ("message_log", {"guild_id": 0, "_id": {"$gte": 0}}, [("_id", DESCENDING)]),
+    ("inventory", {"user_id": "0", "item_id": {"$gt": 0}}, [("item_id", ASCENDING)]),
+    ("earnings_rollups", {"guild_id": "0", "period": "day", "bucket": "", "earned": {"$gt": 0}}, [("earned", DESCENDING)]),
+]
+
+
+async def merge_duplicate_users(db) -> int:
+    """Merge users documents that share a user_id so the unique index can be built."""
+    merged = 0
+    cursor = await db.users.aggregate(
+        [
+            # Documents without a user_id would all group under null and be merged into one
+            {"$match": {"user_id": {"$exists": True}}},
+            {"$group": {
+                "_id": "$user_id",
+                "ids": {"$push": "$_id"},
+                "balance": {"$sum": "$balance"},
+                "money_lost": {"$sum": "$money_lost"},
+                "inventories": {"$push": "$inventory"},
+                "count": {"$sum": 1},
+            }},
+            {"$match": {"count": {"$gt": 1}}},
+        ],
+        allowDiskUse=True,
+    )
+    async for group in cursor:
+        keep, *duplicates = group["ids"]
+        update = {"balance": group["balance"]}
+        if group["money_lost"]:
+            update["money_lost"] = group["money_lost"]
+        # Legacy embedded inventories are merged too; migration 5 moves them out later
+        inventory = [item for items in group["inventories"] if items for item in items]
+        if inventory:
+            update["inventory"] = inventory
+        await db.users.update_one({"_id": keep}, {"$set": update})
+        await db.users.delete_many({"_id": {"$in": duplicates}})
+        merged += len(duplicates)
+    return merged
+
+
+async def partition_by_guild(db) -> int:
+    """Assign every economy document without a guild to the home guild and drop the global indexes."""
+    for collection, name in LEGACY_INDEXES:
+        try:
+            await db[collection].drop_index(name)
+        except OperationFailure:
+            pass  # Never created (fresh database)
+
+    guild_id = os.getenv("GUILD_ID")
+    if not guild_id:
+        for collection in PARTITIONED:
+            if await db[collection].count_documents({"guild_id": {"$exists": False}}, limit=1):
+                raise RuntimeError("Set GUILD_ID so existing balances can be assigned to a guild")
+        return 0
+
+    assigned = 0
+    for collection in PARTITIONED:
+        result = await db[collection].update_many({"guild_id": {"$exists": False}}, {"$set": {"guild_id": guild_id}})
+        assigned += result.modified_count
+    return assigned
+
+
+# Versioned data migrations, applied once each and in order
+MIGRATIONS = [
+    (1, "drain_reacted_messages", drain_reacted_messages),
+    (2, "merge_duplicate_users", merge_duplicate_users),
+    (3, "fold_legacy_house_balance", fold_legacy_house_balance),
+    (4, "assign_item_ids", assign_item_ids),
+    (5, "migrate_embedded_inventories", migrate_embedded_inventories),
+    (6, "genesis_snapshot", genesis_snapshot),
+    (7, "partition_by_guild", partition_by_guild),
+    (8, "migrate_messages", migrate_messages),
+    (9, "assign_message_guilds", assign_message_guilds),
+]
+
+
+async def ensure_indexes(db):
+    """Create every declared index; returns the ones that could not be built yet."""
+    failed = []
+    for collection, keys, options in INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+        except OperationFailure as error:
+            failed.append((collection, keys, options))
+            print(f"[Migrations] Could not create index {options.get('name')} on {collection}: {error}")
+    return failed
+
+
+async def apply_migrations(db) -> None:
+    """Apply every migration that is not yet recorded in schema_migrations."""
+    applied = {doc["_id"] async for doc in db.schema_migrations.find({}, {"_id": 1})}
+    for version, name, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        started = time.perf_counter()
+        print(f"[Migrations] Applying {version}: {name}")
+        result = await migration(db)
+        elapsed = time.perf_counter() - started
+        await db.schema_migrations.insert_one({
+            "_id": version,
+            "name": name,
+            "result": result,
+            "applied_at": datetime.now(timezone.utc),
+            "duration_seconds": elapsed,
+        })
+        print(f"[Migrations] Applied {version}: {name} ({result}) in {elapsed:.2f}s")
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    yield plan.get("stage")
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    if "queryPlan" in plan:
+        # Slot-based engine wraps the classic plan
+        yield from _plan_stages(plan["queryPlan"])
+
+
+async def report_slow_plans(db) -> None:
+    """Explain the representative queries and report any that scan or sort in memory."""
+    for collection, query, sort in PLAN_CHECKS:
+        cursor = db[collection].find(query).limit(10)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explain = await cursor.explain()
+        except OperationFailure as error:
+            print(f"[Migrations] Could not explain {collection} {query}: {error}")
+            continue
+
+        stages = set(_plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {})))
+        problems = sorted(stages & {"COLLSCAN", "SORT"})
+        stats = explain.get("executionStats", {})
+        if problems:
+            print(
+                f"[Migrations] Slow plan for {collection} find {query} sort {sort}: {', '.join(problems)} "
+                f"(examined {stats.get('totalDocsExamined', '?')} docs for {stats.get('nReturned', '?')} results)"
+            )
+
+
+async def run_migrations(db) -> None:
+    """Bring indexes and data up to date; called from setup_hook before any cog loads."""
+    failed = await ensure_indexes(db)
+    await apply_migrations(db)
+
+    # Indexes blocked by old data (e.g. duplicate user_ids) are retried after the migrations fix it
+    for collection, keys, options in failed:
+        await db[collection].create_index(keys, **options)
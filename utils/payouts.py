@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from bson import ObjectId
+
+
+def current_period(now: datetime = None) -> str:
+    """Payout periods are UTC days."""
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+
+
+def previous_period(period: str) -> str:
+    return (datetime.strptime(period, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+async def apply_interest(db, period: str, rate: float, cap: int) -> int:
+    """
+    Pay `rate` interest (at most `cap`) on every positive balance, once per period.
+
+    A single update_many with a pipeline update computes the payout inside Mongo.
+    `payouts.interest` marks who was paid for `period`, so a rerun after a crash
+    only touches the users the interrupted run didn't reach. The marker's `op`
+    id tells record_payouts whether the leaderboard has seen the payout yet.
+    """
+    # $multiply by a float gives a double; convert back so balances stay integers
+    payout = {"$min": [cap, {"$toLong": {"$floor": {"$multiply": ["$balance", rate]}}}]}
+    result = await db.users.update_many(
+        {"balance": {"$gt": 0}, "payouts.interest.period": {"$ne": period}},
+        [{"$set": {
+            "payouts.interest": {"period": period, "amount": payout, "op": ObjectId()},
+            "balance": {"$add": ["$balance", payout]},
+        }}],
+    )
+    return result.modified_count
+
+
+async def apply_stipend(db, period: str, members: Iterable[Tuple[str, str]], amount: int) -> int:
+    """Pay a flat stipend to each (guild_id, user_id), once per period, with the same marker scheme."""
+    by_guild: Dict[str, List[str]] = {}
+    for guild_id, user_id in members:
+        by_guild.setdefault(guild_id, []).append(user_id)
+    if not by_guild:
+        return 0
+    result = await db.users.update_many(
+        {
+            "$or": [{"guild_id": guild_id, "user_id": {"$in": user_ids}} for guild_id, user_ids in by_guild.items()],
+            "payouts.stipend.period": {"$ne": period},
+        },
+        [{"$set": {
+            "payouts.stipend": {"period": period, "amount": amount, "op": ObjectId()},
+            "balance": {"$add": ["$balance", amount]},
+        }}],
+    )
+    return result.modified_count
+
+
+async def active_users(db, period: str) -> List[Tuple[str, str]]:
+    """(guild_id, user_id) of everyone who earned from reactions on the day before `period`."""
+    # Rollup day buckets use the same YYYY-MM-DD keys as payout periods
+    cursor = db.earnings_rollups.find(
+        {"period": "day", "bucket": previous_period(period), "earned": {"$gt": 0}},
+        {"_id": 0, "guild_id": 1, "user_id": 1},
+    )
+    return [(row["guild_id"], row["user_id"]) async for row in cursor]
+
+
+async def record_payouts(db, kind: str, period: str, ledger, leaderboard, batch_size: int = 1000) -> int:
+    """
+    Log every `kind` payout of `period` in the ledger and add it to the leaderboard.
+
+    The op_key makes each entry unique, so running this again after a resumed
+    payout never logs a user twice. Payouts reach the leaderboard as deltas, only
+    for update_many ops it hasn't applied yet (ops before the load are already in
+    the boards), and all at once at the end so an interrupted run applies none.
+    """
+    recorded = 0
+    missed = []
+    cursor = db.users.find(
+        {f"payouts.{kind}.period": period},
+        {"_id": 0, "guild_id": 1, "user_id": 1, f"payouts.{kind}": 1},
+        batch_size=batch_size,
+    )
+    async for user in cursor:
+        guild_id, user_id = user["guild_id"], user["user_id"]
+        marker = user["payouts"][kind]
+        amount = marker["amount"]
+        if amount:
+            ledger.record(guild_id, user_id, amount, kind, op_key=f"{kind}:{period}:{guild_id}:{user_id}")
+            if "op" in marker and leaderboard.missed(marker["op"]):
+                missed.append((guild_id, user_id, amount, marker["op"]))
+        recorded += 1
+    await ledger.flush()
+
+    for guild_id, user_id, amount, _ in missed:
+        leaderboard.adjust(guild_id, user_id, balance=amount)
+    leaderboard.applied_ops.update(op_id for *_, op_id in missed)
+    return recorded
+
+
+async def run_payout(db, kind: str, period: str, apply, ledger, leaderboard) -> bool:
+    """
+    Apply one payout for `period` and log it, unless a finished run is recorded.
+
+    Both steps are idempotent, so a run interrupted at any point is simply
+    repeated; returns False when the period was already paid out.
+    """
+    run_id = f"{kind}:{period}"
+    if await db.payout_runs.find_one({"_id": run_id, "finished_at": {"$exists": True}}):
+        return False
+    await db.payout_runs.update_one(
+        {"_id": run_id},
+        {"$setOnInsert": {"started_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    applied = await apply()
+    recorded = await record_payouts(db, kind, period, ledger, leaderboard)
+    await db.payout_runs.update_one(
+        {"_id": run_id},
+        {"$set": {"finished_at": datetime.now(timezone.utc), "applied": applied, "paid_users": recorded}},
+    )
+    print(f"[Payouts] {run_id}: paid {applied} users this run, {recorded} in total")
+    return True
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Dict, NamedTuple, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+# Purchase outcomes
+PURCHASED = "purchased"
+SOLD_OUT = "sold_out"
+INSUFFICIENT_FUNDS = "insufficient_funds"
+CLOSED = "closed"  # The queue shut down before this buyer was served; nothing was charged
+
+
+class PurchaseResult(NamedTuple):
+    status: str
+    user: Optional[dict] = None  # Buyer after the debit (balance etc.)
+    stock: Optional[int] = None  # Units left after this purchase, None for unlimited items
+
+
+class Purchases:
+    """
+    Buys shop items: reserve a unit of stock, debit the buyer, add the item to their inventory.
+
+    Stock is only ever taken by a conditional $inc (stock > 0), so concurrent buyers
+    can never oversell; a later step failing hands the unit back. Items flagged
+    `queue` are bought one at a time through a FIFO so a drop goes out in arrival order.
+    """
+
+    def __init__(self, shop, economy, inventory):
+        self.shop = shop
+        self.economy = economy
+        self.inventory = inventory
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._closed = False
+
+    async def buy(self, guild_id: str, user_id: str, item: dict) -> PurchaseResult:
+        if item.get("queue") and "stock" in item:
+            return await self._enqueue(guild_id, user_id, item)
+        return await self._buy(guild_id, user_id, item)
+
+    async def _buy(self, guild_id: str, user_id: str, item: dict) -> PurchaseResult:
+        limited = "stock" in item
+        stock = None
+        if limited:
+            reserved = await self.shop.find_one_and_update(
+                {"item_id": item["item_id"], "stock": {"$gt": 0}},
+                {"$inc": {"stock": -1}},
+                projection={"_id": 0, "stock": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            if reserved is None:
+                return PurchaseResult(SOLD_OUT, stock=0)
+            stock = reserved["stock"]
+
+        try:
+            user = await self.economy.debit(guild_id, user_id, item["price"], reason="shop")
+            if user is None:
+                if limited:
+                    await self._release(item)
+                return PurchaseResult(INSUFFICIENT_FUNDS, stock=stock)
+            try:
+                await self.inventory.add(user_id, item)
+            except PyMongoError:
+                await self.economy.credit(guild_id, user_id, item["price"], reason="refund")
+                raise
+        except PyMongoError:
+            if limited:
+                await self._release(item)
+            raise
+
+        return PurchaseResult(PURCHASED, user, stock)
+
+    async def _release(self, item: dict) -> None:
+        """Hand a reserved unit back after a purchase could not complete."""
+        await self.shop.update_one({"item_id": item["item_id"]}, {"$inc": {"stock": 1}})
+
+    async def _enqueue(self, guild_id: str, user_id: str, item: dict) -> PurchaseResult:
+        if self._closed:
+            return PurchaseResult(CLOSED)
+        item_id = item["item_id"]
+        if item_id not in self._queues:
+            self._queues[item_id] = asyncio.Queue()
+            self._workers[item_id] = asyncio.create_task(self._drain(self._queues[item_id]))
+        future = asyncio.get_running_loop().create_future()
+        await self._queues[item_id].put((guild_id, user_id, item, future))
+        return await future
+
+    async def _drain(self, queue: asyncio.Queue) -> None:
+        """Serve queued buyers for one item strictly in arrival order."""
+        while True:
+            entry = await queue.get()
+            if entry is None:
+                return  # stop() was called
+            guild_id, user_id, item, future = entry
+            try:
+                result = await self._buy(guild_id, user_id, item)
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self) -> None:
+        """Turn away everyone still queued and let each worker finish the buyer it is serving."""
+        self._closed = True
+        for queue in self._queues.values():
+            while not queue.empty():
+                _, _, _, future = queue.get_nowait()
+                if not future.done():
+                    future.set_result(PurchaseResult(CLOSED))
+            # Wakes an idle worker, or ends a busy one after its current purchase
+            queue.put_nowait(None)
+        # Cancelling mid-purchase could strand a reserved unit, so wait instead
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._queues.clear()
+        self._workers.clear()
@@ -0,0 +1,124 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+
+TTL_INDEX_NAME = "created_at_ttl"
+
+
+class ReactionClaims:
+    """De-duplicates reaction rewards with a unique (reactor_id, message_id) index."""
+
+    def __init__(self, collection, ttl_days: Optional[int] = None):
+        self.collection = collection
+        self.ttl_days = ttl_days
+        self._deferred = {}  # (reactor_id, message_id) -> claim document waiting for flush()
+        self._inflight = {}  # Claims currently being written by flush()
+
+    async def ensure_ttl_index(self) -> None:
+        """Create or update the optional TTL index (the unique index is declared in utils.migrations)."""
+        if not self.ttl_days:
+            return
+
+        expire_after = self.ttl_days * 86400
+        try:
+            await self.collection.create_index("created_at", expireAfterSeconds=expire_after, name=TTL_INDEX_NAME)
+        except OperationFailure:
+            # The TTL changed since the index was built; update it in place instead of rebuilding
+            await self.collection.database.command(
+                "collMod",
+                self.collection.name,
+                index={"name": TTL_INDEX_NAME, "expireAfterSeconds": expire_after},
+            )
+
+    async def claim(self, reactor_id: str, message_id: str) -> bool:
+        """Record a reaction; returns False if this reactor already claimed this message."""
+        try:
+            await self.collection.insert_one({
+                "reactor_id": reactor_id,
+                "message_id": message_id,
+                "created_at": datetime.now(timezone.utc),
+            })
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def defer(self, reactor_id: str, message_id: str) -> None:
+        """Queue a claim already known to be new; it is written by the next flush()."""
+        self._deferred[(reactor_id, message_id)] = {
+            "reactor_id": reactor_id,
+            "message_id": message_id,
+            "created_at": datetime.now(timezone.utc),
+        }
+
+    def is_pending(self, reactor_id: str, message_id: str) -> bool:
+        """Check whether a claim is deferred or being written but not yet acknowledged."""
+        key = (reactor_id, message_id)
+        return key in self._deferred or key in self._inflight
+
+    async def flush(self) -> None:
+        """Write deferred claims in one unordered insert_many."""
+        if not self._deferred:
+            return
+
+        self._inflight, self._deferred = self._deferred, {}
+        keys = list(self._inflight)
+        try:
+            await self.collection.insert_many([self._inflight[key] for key in keys], ordered=False)
+        except BulkWriteError as error:
+            # Duplicates mean the claim is already stored; retry anything else
+            for write_error in error.details.get("writeErrors", []):
+                if write_error["code"] != 11000:
+                    key = keys[write_error["index"]]
+                    self._deferred.setdefault(key, self._inflight[key])
+        except PyMongoError as error:
+            print(f"[ReactionClaims] Flush of {len(keys)} claims failed: {error}")
+            for key in keys:
+                self._deferred.setdefault(key, self._inflight[key])
+        finally:
+            self._inflight = {}
+
+
+async def drain_reacted_messages(db, batch_size: int = 500) -> int:
+    """
+    Move every users.reacted_messages array into reaction_claims and unset it.
+
+    Safe to re-run: claims are inserted unordered so duplicates are skipped,
+    and an array is only removed after its claims are written.
+    """
+    claims = db.reaction_claims
+    now = datetime.now(timezone.utc)
+    migrated = 0
+
+    cursor = db.users.find(
+        {"reacted_messages.0": {"$exists": True}},
+        {"user_id": 1, "reacted_messages": 1},
+        batch_size=batch_size,
+    )
+    batch_users = []
+    batch_claims = []
+
+    async def write_batch():
+        if batch_claims:
+            try:
+                await claims.insert_many(batch_claims, ordered=False)
+            except BulkWriteError as error:
+                # Duplicate key errors are expected on re-runs; anything else is a real failure
+                if any(e["code"] != 11000 for e in error.details.get("writeErrors", [])):
+                    raise
+        await db.users.update_many({"user_id": {"$in": batch_users}}, {"$unset": {"reacted_messages": ""}})
+
+    async for user in cursor:
+        batch_users.append(user["user_id"])
+        for message_id in set(user["reacted_messages"]):
+            batch_claims.append({"reactor_id": user["user_id"], "message_id": message_id, "created_at": now})
+        if len(batch_claims) >= batch_size:
+            await write_batch()
+            migrated += len(batch_users)
+            batch_users, batch_claims = [], []
+
+    if batch_users:
+        await write_batch()
+        migrated += len(batch_users)
+
+    return migrated
@@ -0,0 +1,77 @@
+from typing import Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from utils.write_behind import WriteBehindBuffer
+
+
+class RewardBatcher(WriteBehindBuffer):
+    """Write-behind buffer that merges reward $inc deltas per user and flushes them in one bulk_write."""
+
+    def __init__(self, collection, max_batch: int = 500, flush_interval: float = 2.0, claims=None, ledger=None):
+        super().__init__(max_batch, flush_interval)
+        self.collection = collection
+        self.claims = claims  # Deferred reaction claims are written before the rewards they guard
+        self.ledger = ledger  # Applied deltas are logged once per user per flush
+        self._balances: Dict[Tuple[str, str], int] = {}  # (guild_id, user_id) -> pending balance delta
+        self.stats.update(operations=0, last_batch_size=0, max_batch_size=0)
+
+    def add(self, guild_id: str, user_id: str, amount: int) -> None:
+        """Queue a balance increment for a user in a guild."""
+        key = (guild_id, user_id)
+        self._balances[key] = self._balances.get(key, 0) + amount
+        self._flush_when_full()
+
+    @property
+    def pending(self) -> int:
+        """Number of users with buffered changes."""
+        return len(self._balances)
+
+    async def _write(self) -> Optional[bool]:
+        """Write all buffered deltas as one unordered bulk upsert."""
+        if self.claims:
+            await self.claims.flush()
+        if not self._balances:
+            return None
+
+        # Swap the buffers so new rewards keep accumulating while we write
+        balances, self._balances = self._balances, {}
+
+        user_ids = list(balances)
+        operations = [
+            UpdateOne({"guild_id": guild_id, "user_id": user_id}, {"$inc": {"balance": balances[(guild_id, user_id)]}}, upsert=True)
+            for guild_id, user_id in user_ids
+        ]
+
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as error:
+            # Unordered: everything except the reported operations was applied
+            failed = [user_ids[e["index"]] for e in error.details.get("writeErrors", [])]
+            print(f"[RewardBatcher] {len(failed)} of {len(operations)} operations failed: {error}")
+            self._log(set(user_ids) - set(failed), balances)
+            self._requeue(failed, balances)
+            return False
+        except PyMongoError as error:
+            # Nothing was acknowledged; put the deltas back so the next flush retries them
+            print(f"[RewardBatcher] Flush of {len(operations)} operations failed: {error}")
+            self._requeue(user_ids, balances)
+            return False
+
+        self._log(user_ids, balances)
+        self.stats["operations"] += len(operations)
+        self.stats["last_batch_size"] = len(operations)
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(operations))
+        return True
+
+    def _log(self, user_ids, balances) -> None:
+        """Record the deltas that were actually applied in the ledger."""
+        if self.ledger:
+            for guild_id, user_id in user_ids:
+                self.ledger.record(guild_id, user_id, balances[(guild_id, user_id)], "reactions")
+
+    def _requeue(self, user_ids, balances) -> None:
+        """Merge unwritten deltas back into the live buffer."""
+        for user_id in user_ids:
+            self._balances[user_id] = self._balances.get(user_id, 0) + balances[user_id]
@@ -0,0 +1,62 @@
+from typing import Dict, NamedTuple
+
+
+class Reward(NamedTuple):
+    reactor: int  # Paid to the person reacting
+    author: int  # Paid to the message author
+    limit: int  # Paid reactions per reactor per throttle window
+
+
+# Payouts for guilds that haven't configured their own table
+DEFAULT_REWARDS = {
+    "💀": Reward(200, 1000, 20),
+    "😂": Reward(50, 250, 30),
+    "🐐": Reward(300, 1500, 10),
+    "✅": Reward(150, 750, 20),
+}
+
+
+class RewardTables:
+    """
+    Per-guild emoji reward tables, compiled into dicts and cached in memory.
+
+    Stored as {_id: guild_id, rewards: [{emoji, reactor, author, limit}]}; a list
+    rather than an emoji-keyed object since custom emoji strings aren't safe field names.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._tables: Dict[str, Dict[str, Reward]] = {}
+
+    async def load(self) -> None:
+        async for doc in self.collection.find():
+            self._tables[doc["_id"]] = self._compile(doc.get("rewards", []))
+
+    @staticmethod
+    def _compile(rewards) -> Dict[str, Reward]:
+        return {r["emoji"]: Reward(int(r["reactor"]), int(r["author"]), int(r["limit"])) for r in rewards}
+
+    def get(self, guild_id: str) -> Dict[str, Reward]:
+        """The emoji -> Reward lookup for a guild."""
+        return self._tables.get(guild_id, DEFAULT_REWARDS)
+
+    async def _save(self, guild_id: str, table: Dict[str, Reward]) -> None:
+        rewards = [{"emoji": emoji, **reward._asdict()} for emoji, reward in table.items()]
+        await self.collection.update_one({"_id": guild_id}, {"$set": {"rewards": rewards}}, upsert=True)
+        self._tables[guild_id] = table
+
+    async def set_reward(self, guild_id: str, emoji: str, reward: Reward) -> None:
+        """Add or change one emoji's payout, starting from the defaults for a new guild."""
+        await self._save(guild_id, {**self.get(guild_id), emoji: reward})
+
+    async def remove_reward(self, guild_id: str, emoji: str) -> bool:
+        table = dict(self.get(guild_id))
+        if table.pop(emoji, None) is None:
+            return False
+        await self._save(guild_id, table)
+        return True
+
+    async def reset(self, guild_id: str) -> None:
+        """Go back to the default table."""
+        await self.collection.delete_one({"_id": guild_id})
+        self._tables.pop(guild_id, None)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from utils.write_behind import WriteBehindBuffer
+
+# How long each period's buckets are kept before the TTL index removes them
+RETENTION = {"day": timedelta(days=35), "week": timedelta(weeks=15)}
+
+
+def bucket_keys(now: datetime) -> Dict[str, str]:
+    """The UTC day and ISO week buckets `now` falls in."""
+    year, week, _ = now.isocalendar()
+    return {"day": now.strftime("%Y-%m-%d"), "week": f"{year}-W{week:02d}"}
+
+
+class EarningsRollups(WriteBehindBuffer):
+    """
+    Per-user earned/lost totals for the current day and week, per guild.
+
+    Increments are merged in memory per (guild, period, bucket, user) and flushed as
+    one unordered bulk upsert, so the windowed boards read a single small bucket
+    through the (guild_id, period, bucket, field) indexes instead of scanning history.
+    """
+
+    def __init__(self, collection, max_batch: int = 500, flush_interval: float = 5.0):
+        super().__init__(max_batch, flush_interval)
+        self.collection = collection
+        self._pending: Dict[Tuple[str, str, str, str], Dict[str, int]] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, guild_id: str, user_id: str, earned: int = 0, lost: int = 0) -> None:
+        """Count earnings or losses towards the buckets covering right now."""
+        for period, bucket in bucket_keys(datetime.now(timezone.utc)).items():
+            totals = self._pending.setdefault((guild_id, period, bucket, user_id), {"earned": 0, "lost": 0})
+            totals["earned"] += earned
+            totals["lost"] += lost
+        self._flush_when_full()
+
+    async def _write(self) -> Optional[bool]:
+        if not self._pending:
+            return None
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"guild_id": guild_id, "period": period, "bucket": bucket, "user_id": user_id},
+                {"$inc": pending[(guild_id, period, bucket, user_id)], "$setOnInsert": {"expires_at": now + RETENTION[period]}},
+                upsert=True,
+            )
+            for guild_id, period, bucket, user_id in keys
+        ]
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as error:
+            failed = [keys[e["index"]] for e in error.details.get("writeErrors", [])]
+            print(f"[EarningsRollups] {len(failed)} of {len(operations)} operations failed: {error}")
+            self._requeue(failed, pending)
+            return False
+        except PyMongoError as error:
+            print(f"[EarningsRollups] Flush of {len(operations)} operations failed: {error}")
+            self._requeue(keys, pending)
+            return False
+        return True
+
+    def _requeue(self, keys, pending) -> None:
+        for key in keys:
+            totals = self._pending.setdefault(key, {"earned": 0, "lost": 0})
+            totals["earned"] += pending[key]["earned"]
+            totals["lost"] += pending[key]["lost"]
+
+    async def top(self, guild_id: str, period: str, field: str, count: int = 10) -> List[Tuple[str, int]]:
+        """Top `count` (user_id, total) pairs for `field` in a guild's current bucket of `period`."""
+        bucket = bucket_keys(datetime.now(timezone.utc))[period]
+        cursor = self.collection.find(
+            {"guild_id": guild_id, "period": period, "bucket": bucket, field: {"$gt": 0}},
+            {"_id": 0, "user_id": 1, field: 1},
+        ).sort(field, DESCENDING).limit(count)
+        return [(row["user_id"], row[field]) async for row in cursor]
@@ -0,0 +1,94 @@
+import hashlib
+import math
+import time
+from collections import OrderedDict
+
+SEEN = "seen"    # Definitely seen: exact LRU hit
+MAYBE = "maybe"  # Bloom filter hit, or too old for the filter to know; ask the database
+NEW = "new"      # Definitely not seen since the filter started covering this message
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self.started_at = time.time()
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenFilter:
+    """
+    In-memory pre-filter for (reactor, message) pairs.
+
+    An exact LRU of recent pairs answers repeat reactions outright. Behind it,
+    two rotating Bloom filter generations remember every pair added since the
+    older generation started; a miss there is only trusted for messages created
+    after that point, so the filter starts empty and fills lazily after a restart.
+    """
+
+    def __init__(self, capacity: int = 200_000, error_rate: float = 0.001, lru_size: int = 10_000):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lru_size = lru_size
+        self.recent = OrderedDict()
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = None
+        self.stats = {SEEN: 0, MAYBE: 0, NEW: 0}
+
+    @staticmethod
+    def _key(reactor_id: str, message_id: str) -> str:
+        return f"{reactor_id}:{message_id}"
+
+    @property
+    def covered_since(self) -> float:
+        """Unix time from which every added pair is still in a live generation."""
+        return (self.previous or self.current).started_at
+
+    def check(self, reactor_id: str, message_id: str, message_created_at: float) -> str:
+        """Classify a pair as SEEN, MAYBE or NEW without touching the database."""
+        key = self._key(reactor_id, message_id)
+        if key in self.recent:
+            self.recent.move_to_end(key)
+            verdict = SEEN
+        elif key in self.current or (self.previous is not None and key in self.previous):
+            verdict = MAYBE
+        elif message_created_at < self.covered_since:
+            # Reactions to this message may predate the filter
+            verdict = MAYBE
+        else:
+            verdict = NEW
+        self.stats[verdict] += 1
+        return verdict
+
+    def add(self, reactor_id: str, message_id: str) -> None:
+        """Remember a pair that has been claimed."""
+        key = self._key(reactor_id, message_id)
+        self.recent[key] = None
+        self.recent.move_to_end(key)
+        if len(self.recent) > self.lru_size:
+            self.recent.popitem(last=False)
+
+        if self.current.count >= self.capacity:
+            self.previous, self.current = self.current, BloomFilter(self.capacity, self.error_rate)
+        self.current.add(key)
+
+    def forget(self, reactor_id: str, message_id: str) -> None:
+        """Drop a pair that was added but never claimed; the Bloom bits stay, so it checks as MAYBE."""
+        self.recent.pop(self._key(reactor_id, message_id), None)
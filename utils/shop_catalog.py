@@ -0,0 +1,105 @@
+import asyncio
+from typing import Dict, Optional
+
+import discord
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+
+CATALOG_META_ID = "catalog"
+
+
+async def assign_item_ids(db) -> int:
+    """Give every shop item without one a stable, sequential item_id."""
+    last = await db.shop.find_one({"item_id": {"$exists": True}}, {"item_id": 1}, sort=[("item_id", -1)])
+    next_id = last["item_id"] + 1 if last else 1
+    assigned = 0
+    async for item in db.shop.find({"item_id": {"$exists": False}}, {"_id": 1}).sort("_id", ASCENDING):
+        await db.shop.update_one({"_id": item["_id"]}, {"$set": {"item_id": next_id}})
+        next_id += 1
+        assigned += 1
+    return assigned
+
+
+class ShopCatalog:
+    """
+    In-memory copy of the shop collection keyed by item_id.
+
+    Reloaded when a change stream reports an edit, or, on deployments without
+    change streams, when the version counter in shop_meta moves.
+    """
+
+    def __init__(self, db, poll_interval: float = 60):
+        self.db = db
+        self.poll_interval = poll_interval
+        self.items: Dict[int, dict] = {}
+        self.embed: Optional[discord.Embed] = None  # Pre-rendered /shop embed
+        self.version = None
+        self._watch_task = None
+
+    def get(self, item_id: int) -> Optional[dict]:
+        return self.items.get(item_id)
+
+    async def load(self) -> None:
+        """Load every item and rebuild the /shop embed; read-only, so it is safe on every change event."""
+        meta = await self.db.shop_meta.find_one({"_id": CATALOG_META_ID})
+        items = await self.db.shop.find().sort("item_id", ASCENDING).to_list(length=None)
+        # Items added by hand get their item_id from !reloadshop; until then they aren't listed
+        self.items = {item["item_id"]: item for item in items if "item_id" in item}
+        self.version = meta.get("version", 0) if meta else 0
+        self.embed = self._render() if self.items else None
+
+    def _render(self) -> discord.Embed:
+        embed = discord.Embed(
+            title="Shop Items",
+            description="Here are the items you can purchase (use the item ID to buy):",
+            color=discord.Color.gold()
+        )
+        for item_id, item in self.items.items():
+            value = item.get('description', 'No description available.')
+            if "stock" in item:
+                # Live counts change with every purchase, so only flag the item here
+                value += "\n*Limited stock*"
+            embed.add_field(
+                name=f"{item_id}. {item['name']} - {item['price']} coins",
+                value=value,
+                inline=False
+            )
+        return embed
+
+    async def bump_version(self) -> None:
+        """Mark the catalog as changed so every watcher reloads it."""
+        meta = await self.db.shop_meta.find_one_and_update(
+            {"_id": CATALOG_META_ID},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self.version = meta["version"]
+
+    def start(self) -> None:
+        self._watch_task = asyncio.create_task(self._watch())
+
+    def stop(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+
+    async def _watch(self) -> None:
+        """Reload on change stream events, falling back to polling the version counter."""
+        try:
+            # Purchases of limited items only decrement stock; they don't need a reload
+            pipeline = [{"$match": {"updateDescription.updatedFields.stock": {"$exists": False}}}]
+            async with await self.db.shop.watch(pipeline) as stream:
+                async for _ in stream:
+                    await self.load()
+        except PyMongoError as error:
+            # Change streams need a replica set; poll the version counter instead
+            print(f"[ShopCatalog] Change stream unavailable, polling catalog version: {error}")
+
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                meta = await self.db.shop_meta.find_one({"_id": CATALOG_META_ID})
+                if (meta.get("version", 0) if meta else 0) != self.version:
+                    await self.load()
+            except PyMongoError as error:
+                print(f"[ShopCatalog] Failed to check catalog version: {error}")
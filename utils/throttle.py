@@ -0,0 +1,63 @@
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict
+
+
+class _Window:
+    """Ring buffer of the last `limit` allowed timestamps for one key."""
+
+    __slots__ = ("stamps", "position")
+
+    def __init__(self, limit: int):
+        self.stamps = array("d", bytes(8 * limit))  # limit zeros, 8 bytes each
+        self.position = 0
+
+
+class SlidingWindowThrottle:
+    """
+    Allows at most `limit` events per key within any `window` seconds.
+
+    Each key keeps only its last `limit` timestamps in a ring buffer: an event is
+    allowed when the oldest of them has left the window. Keys are kept in LRU
+    order and the least recently active are dropped past `max_keys`.
+    """
+
+    def __init__(self, window: float = 60, max_keys: int = 10_000):
+        self.window = window
+        self.max_keys = max_keys
+        self._windows: "OrderedDict[tuple, _Window]" = OrderedDict()
+        self.dropped = 0
+        self.dropped_by_key: Dict[str, int] = {}  # Drops per limit bucket (e.g. emoji)
+
+    def allow(self, user_id: str, bucket: str, limit: int) -> bool:
+        """Record an event for (user_id, bucket) if it is under `limit`; returns False if dropped."""
+        now = time.monotonic()
+        key = (user_id, bucket)
+        window = self._windows.get(key)
+        if window is None or len(window.stamps) != limit:
+            window = self._windows[key] = _Window(limit)
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+
+        # The slot about to be overwritten holds the oldest of the last `limit` events
+        if window.stamps[window.position] and now - window.stamps[window.position] < self.window:
+            self.dropped += 1
+            self.dropped_by_key[bucket] = self.dropped_by_key.get(bucket, 0) + 1
+            return False
+        window.stamps[window.position] = now
+        window.position = (window.position + 1) % limit
+        return True
+
+    def release(self, user_id: str, bucket: str) -> None:
+        """Give back the slot taken by the latest allowed event for (user_id, bucket)."""
+        window = self._windows.get((user_id, bucket))
+        if window is None:
+            return
+        window.position = (window.position - 1) % len(window.stamps)
+        window.stamps[window.position] = 0
+
+    def __len__(self) -> int:
+        return len(self._windows)
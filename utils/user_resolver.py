@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional
+
+import discord
+
+
+class Profile(NamedTuple):
+    id: int
+    name: str
+    discriminator: str
+    avatar_url: str
+    banner_url: Optional[str]
+    has_banner_info: bool  # False when built from the gateway cache, which never carries banners
+
+    @property
+    def tag(self) -> str:
+        return f"{self.name}#{self.discriminator}"
+
+
+class UserResolver:
+    """Shared user-profile lookup with a TTL + LRU cache and bounded concurrent fetches."""
+
+    def __init__(self, bot, ttl: float = 600, max_size: int = 5000, concurrency: int = 5):
+        self.bot = bot
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache = OrderedDict()  # user_id -> (expires_at, Profile or None for unknown users)
+        self._inflight: Dict[int, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @staticmethod
+    def _profile(user: discord.User, has_banner_info: bool) -> Profile:
+        return Profile(
+            id=user.id,
+            name=user.name,
+            discriminator=user.discriminator,
+            avatar_url=user.display_avatar.url,
+            banner_url=user.banner.url if user.banner else None,
+            has_banner_info=has_banner_info,
+        )
+
+    def _store(self, user_id: int, profile: Optional[Profile]) -> None:
+        self._cache[user_id] = (time.monotonic() + self.ttl, profile)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def _cached(self, user_id: int, with_banner: bool):
+        """Return (hit, profile) from the cache."""
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return False, None
+        expires_at, profile = entry
+        if expires_at < time.monotonic() or (with_banner and profile is not None and not profile.has_banner_info):
+            return False, None
+        self._cache.move_to_end(user_id)
+        return True, profile
+
+    async def _fetch(self, user_id: int) -> Optional[Profile]:
+        async with self._semaphore:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                profile = None
+            except discord.HTTPException:
+                # Transient API failure; don't cache it
+                return None
+            else:
+                profile = self._profile(user, has_banner_info=True)
+        self._store(user_id, profile)
+        return profile
+
+    async def resolve(self, user_id: int, with_banner: bool = False) -> Optional[Profile]:
+        """Resolve one user; returns None if the user does not exist."""
+        hit, profile = self._cached(user_id, with_banner)
+        if hit:
+            return profile
+
+        if not with_banner:
+            user = self.bot.get_user(user_id)
+            if user:
+                profile = self._profile(user, has_banner_info=False)
+                self._store(user_id, profile)
+                return profile
+
+        # Share one REST call between concurrent lookups of the same user
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch(user_id))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        return await task
+
+    async def resolve_many(self, user_ids: Iterable[int], with_banner: bool = False) -> Dict[int, Optional[Profile]]:
+        """Resolve several users concurrently, at most `concurrency` REST calls at a time."""
+        user_ids = list(dict.fromkeys(user_ids))
+        profiles = await asyncio.gather(*(self.resolve(user_id, with_banner) for user_id in user_ids))
+        return dict(zip(user_ids, profiles))
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from typing import Optional
+
+from discord.ext import tasks
+
+
+class WriteBehindBuffer:
+    """
+    Base for in-memory buffers written to Mongo in batches.
+
+    Subclasses hold their own buffer, report its size through `pending` and
+    implement `_write()`, which swaps the buffer out, writes it, and merges back
+    anything that failed. Writes happen every `flush_interval` seconds, or as soon
+    as `max_batch` entries are waiting, one at a time under a lock.
+
+    flush() is shielded, so cancelling a caller (the flush loop on stop(), or a
+    task awaiting a flush) never abandons a batch that was already swapped out.
+    """
+
+    def __init__(self, max_batch: int = 500, flush_interval: float = 2.0):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._lock = asyncio.Lock()
+        self._size_flush = None  # Task started when the buffer hits max_batch
+        self.stats = {"flushes": 0, "failed_flushes": 0, "last_flush_ms": 0.0, "total_flush_ms": 0.0}
+
+    @property
+    def pending(self) -> int:
+        raise NotImplementedError
+
+    async def _write(self) -> Optional[bool]:
+        """Write the buffer; None if it was empty, False if anything had to be requeued."""
+        raise NotImplementedError
+
+    def start(self) -> None:
+        """Start the periodic flush loop."""
+        self._flush_loop.change_interval(seconds=self.flush_interval)
+        self._flush_loop.start()
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything still buffered."""
+        # Only interrupts the sleep or the wait on a shielded flush; a write in progress
+        # finishes, and the flush below queues behind it on the lock
+        self._flush_loop.cancel()
+        await self.flush()
+
+    def _flush_when_full(self) -> None:
+        """Start a background flush once max_batch entries are waiting."""
+        if self.pending >= self.max_batch and (self._size_flush is None or self._size_flush.done()):
+            self._size_flush = asyncio.create_task(self.flush())
+
+    async def flush(self) -> bool:
+        """Write everything buffered; returns False if some of it had to be requeued."""
+        return await asyncio.shield(self._flush())
+
+    async def _flush(self) -> bool:
+        async with self._lock:
+            started = time.perf_counter()
+            written = await self._write()
+            if written is None:
+                return True
+            if not written:
+                self.stats["failed_flushes"] += 1
+                return False
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats["flushes"] += 1
+            self.stats["last_flush_ms"] = elapsed_ms
+            self.stats["total_flush_ms"] += elapsed_ms
+            return True
+
+    @tasks.loop(seconds=2)  # Placeholder; interval is set from flush_interval in start()
+    async def _flush_loop(self):
+        await self.flush()